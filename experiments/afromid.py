@@ -0,0 +1,60 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+import asyncio
+from time import sleep
+from timeit import timeit
+
+from idict import idict
+
+
+# Remote cache simulated by a latency of 10ms per access.
+class Remote(dict):
+    def __contains__(self, item):
+        sleep(0.01)
+        return super().__contains__(item)
+
+    def __getitem__(self, item):
+        sleep(0.01)
+        return super().__getitem__(item)
+
+
+cache = Remote()
+ids = [(idict(x=i, y=i + 1) >> [cache]).id for i in range(20)]
+
+
+def requests():
+    return [idict.fromid(id, cache).evaluated.x for id in ids]
+
+
+async def arequests():
+    async def request(id):
+        d = await idict.afromid(id, cache)
+        await d.aevaluate()
+        return d.x
+
+    return await asyncio.gather(*(request(id) for id in ids))
+
+
+t = timeit(requests, number=1)
+print("fromid", f"{t:.2f}s", sep="\t")
+t = timeit(lambda: asyncio.run(arequests()), number=1)
+print("afromid", f"{t:.2f}s", sep="\t")
@@ -0,0 +1,45 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from timeit import timeit
+
+import numpy as np
+from pandas import DataFrame
+
+from idict import idict
+
+# One idict per experiment row: hyperparameters repeat a lot along each column, scores do not.
+rnd = np.random.default_rng(0)
+nrows = 20_000
+df = DataFrame(
+    {
+        "algorithm": rnd.choice(["RF", "SVM", "kNN", "NB"], nrows),
+        "k": rnd.integers(1, 10, nrows),
+        "C": rnd.choice([0.01, 0.1, 1.0, 10.0], nrows),
+        "seed": rnd.integers(0, 100, nrows),
+        "score": rnd.random(nrows),
+    }
+)
+records = df.to_dict("records")
+t = timeit(lambda: [idict(**row) for row in records], number=1)
+print("one at a time", f"{t:.2f}s", sep="\t")
+t = timeit(lambda: idict.frombatch(records), number=1)
+print("frombatch", f"{t:.2f}s", sep="\t")
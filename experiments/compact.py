@@ -0,0 +1,43 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+import gc
+import tracemalloc
+
+from idict import idict
+
+
+def footprint(build):
+    gc.collect()
+    tracemalloc.start()
+    objs = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objs, size
+
+
+# Experiment records sharing the same fields, as they would be held in memory for analysis.
+records = [dict(algorithm="RF", k=i % 10, C=(i % 7) / 10, seed=i, score=i / 100_000) for i in range(50_000)]
+ds = idict.frombatch(records)
+_, size = footprint(lambda: idict.frombatch(records))
+print("idict", f"{size / 2**20:.1f}MiB", sep="\t")
+_, size = footprint(lambda: [d.compact for d in ds])
+print("compact", f"{size / 2**20:.1f}MiB", sep="\t")
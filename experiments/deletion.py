@@ -0,0 +1,33 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from functools import reduce
+from timeit import timeit
+
+from idict import idict
+
+# Trimming many intermediate fields from a wide idict.
+d = idict({f"f{i}": i for i in range(2_000)})
+keys = [f"f{i}" for i in range(0, 2_000, 40)]
+t = timeit(lambda: reduce(lambda e, k: e >> {k: None}, keys, d), number=1)
+print("one by one", f"{t:.2f}s", sep="\t")
+t = timeit(lambda: d >> {k: None for k in keys}, number=1)
+print("at once", f"{t:.2f}s", sep="\t")
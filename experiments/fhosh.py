@@ -1,13 +1,16 @@
 from hashlib import md5
 from timeit import timeit
 
-from idict.core.identification import f2bin
-from idict.function.data import arff2df, df2arff, df2np
+from garoupa import UT40_4
+
+from idict.core.identification import f2bin, fhosh, fhosh_memo
+from idict.function.data import df2list
+from idict.function.dataset import arff2df, df2arff
 from idict.function.evaluation import split
 
-for approach in ["direct", "dill", "clean"]:
+for approach in ["direct", "dill", "clean", "code"]:
     t = 0
-    for func in [arff2df, df2arff, df2np, split]:
+    for func in [arff2df, df2arff, df2list, split]:
         t += timeit(lambda: f2bin(func, approach), number=1000)
     print(approach, t, "ms", md5(f2bin(func, approach)).hexdigest(), sep="\t", end="\t")
     f = lambda a, b=5: {a: (x := "asd" * 5), "r": md5(x * b).hexdigest()}
@@ -27,3 +30,13 @@ for approach in ["direct", "dill", "clean"]:
         f2bin(h, approach)).hexdigest() == md5(f2bin(i, approach)).hexdigest()
     print(r, sep="\t", end="\t")
     print()
+
+
+# Thousands of distinct functions, hashed for the first time (empty memo) and recreated afterwards (memo hits).
+sources = [f"lambda x, y={i}: {{'z': [x * i + {i} for i in range(y)]}}" for i in range(5000)]
+for approach in ["clean", "code"]:
+    fhosh_memo.clear()
+    t = timeit(lambda: [fhosh(eval(src), UT40_4, approach) for src in sources], number=1)
+    print(approach, f"{1000 * t:.1f}ms", "first time", sep="\t", end="\t")
+    t = timeit(lambda: [fhosh(eval(src), UT40_4, approach) for src in sources], number=1)
+    print(f"{1000 * t:.1f}ms", "recreated (including eval)", sep="\t")
@@ -0,0 +1,54 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+import os
+from timeit import timeit
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from idict import idict
+from idict.persistence.sqla import SQLA
+
+# Rebuilding a 40-field idict from a SQLite file, counting SQL queries.
+queries = 0
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def count(*args):
+    global queries
+    queries += 1
+
+
+class SQLAPerItem(SQLA):
+    """SQLA without bulk reads, i.e., one query per key"""
+
+    getmany = contains_many = property()  # Hide the methods from hasattr().
+
+
+if os.path.exists(path := "/tmp/getmany-test.db"):
+    os.remove(path)
+d = idict({f"f{i}": i for i in range(40)}) >> [SQLA(f"sqlite+pysqlite:///{path}")]
+for cache_class in [SQLAPerItem, SQLA]:
+    cache = cache_class(f"sqlite+pysqlite:///{path}")
+    queries = 0
+    t = timeit(lambda: idict.fromid(d.id, cache).evaluated, number=1)
+    print(cache_class.__name__, f"{t:.2f}s", f"{queries} queries", sep="\t")
@@ -0,0 +1,46 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+import os
+from timeit import timeit
+
+from idict import idict
+from idict.persistence.cache import Cache
+from idict.persistence.sqla import SQLA
+
+# Reading a cached field again from a SQLite file (cache hit), i.e., the latency of a single lookup.
+
+
+class SQLAContainsGet(SQLA):
+    """SQLA without the single round-trip 'get', i.e., 'in' followed by '[]'"""
+
+    get = Cache.get
+
+
+if os.path.exists(path := "/tmp/hit-test.db"):
+    os.remove(path)
+(idict(x=3) >> (lambda x: {"y": x + 1}) >> [SQLA(f"sqlite+pysqlite:///{path}")]).evaluate()
+for cache_class in [SQLAContainsGet, SQLA]:
+    cache = cache_class(f"sqlite+pysqlite:///{path}")
+    d = idict(x=3) >> (lambda x: {"y": x + 1}) >> [cache]
+    load = d.frozen.data["y"].f  # Function of the lazy field, which fetches the value from the cache.
+    t = timeit(load, number=300)
+    print(cache_class.__name__, f"{1000 * t / 300:.2f}ms per hit", load() == 4, sep="\t")
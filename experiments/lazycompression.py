@@ -0,0 +1,39 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from timeit import timeit
+
+import numpy as np
+from pandas import DataFrame
+
+from idict import idict, setup
+
+# Construction time of an idict holding a large DataFrame, for each hashing mode.
+rnd = np.random.default_rng(0)
+for nrows in [100_000, 1_000_000]:
+    df = DataFrame(rnd.random((nrows, 10)), columns=[f"attr{i}" for i in range(10)])
+    df["class"] = rnd.integers(0, 3, nrows)
+    print(nrows, "rows")
+    for mode in ["lz4", "pickle"]:
+        setup(hashing=mode)
+        t = timeit(lambda: idict(df=df), number=5) / 5
+        print("", mode, f"{t:.3}s", sep="\t")
+setup(hashing="lz4")
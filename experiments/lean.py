@@ -0,0 +1,45 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+import tracemalloc
+
+import numpy as np
+
+from idict import idict
+
+
+# Chain of large intermediate values, of which only the last (small) one is of interest.
+def chain():
+    d = idict(n=3_000_000)
+    d >>= lambda n: {"a": np.ones(n)}
+    d >>= lambda a: {"b": a * 2}
+    d >>= lambda b: {"c": b + 1}
+    d >>= lambda c: {"d": c - 1}
+    return d >> (lambda d: {"s": float(d.sum())})
+
+
+for lean in [False, True]:
+    d = chain()
+    tracemalloc.start()
+    d.evaluate(lean=lean)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"lean={lean}", f"peak {peak / 2**20:.0f}MiB", f"retained {current / 2**20:.0f}MiB", sep="\t")
@@ -0,0 +1,39 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from time import sleep
+from timeit import timeit
+
+from idict import idict
+
+
+# Independent slow fields (e.g., I/O bound), stored into a cache.
+def build():
+    d = idict(x=3)
+    for i in range(8):
+        d[f"y{i}"] = lambda x: sleep(0.1) or x
+    return d >> (lambda y0, y1, y2, y3, y4, y5, y6, y7: {"z": y0 + y1 + y2 + y3 + y4 + y5 + y6 + y7}) >> [{}]
+
+
+for workers in [1, 8]:
+    d = build()
+    t = timeit(lambda: d.evaluate(workers=workers), number=1)
+    print(f"{workers} worker(s)", f"{t:.2f}s", sep="\t")
@@ -0,0 +1,39 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from timeit import timeit
+
+from idict import idict, let
+from idict.parameter.ifunctionspace import iFunctionSpace
+
+# The same chain of functions applied to many inputs: plain application inspects each function again for every input.
+fs = iFunctionSpace.fromfunctions(
+    lambda x: {"y": x + 1},
+    let(lambda x, y, a=1: {"z": a * x * y}, a=3),
+    lambda y, z: {"w": y - z, "v": y + z},
+    lambda w: {"w": w ** 2},
+)
+inputs = [idict(x=i) for i in range(200)]
+t = timeit(lambda: [d >> fs for d in inputs], number=1)
+print("plain", f"{t:.2f}s", sep="\t")
+pipeline = fs.compile()
+t = timeit(lambda: pipeline.map(inputs), number=1)
+print("compiled", f"{t:.2f}s", sep="\t")
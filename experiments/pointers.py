@@ -0,0 +1,51 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+import os
+from timeit import timeit
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from idict import idict, setup
+from idict.persistence.sqla import SQLA
+
+# Rebuilding (100 times) an idict whose 20 fields hold nested idicts from a SQLite file, counting SQL queries.
+# Each rebuild takes a query for the front id, a bulk one for the fields and one per nested idict (its own fields);
+# known targets only save the pointer hops on top of that.
+queries = 0
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def count(*args):
+    global queries
+    queries += 1
+
+
+if os.path.exists(path := "/tmp/pointers-test.db"):
+    os.remove(path)
+cache = SQLA(f"sqlite+pysqlite:///{path}")
+d = idict({f"f{i}": idict(x=i) for i in range(20)}) >> [cache]
+for limit in [0, 100_000]:
+    setup(pointers_cachelimit=limit)
+    queries = 0
+    t = timeit(lambda: idict.fromid(d.id, cache).evaluated, number=100)
+    print(f"pointers_cachelimit={limit}", f"{t:.2f}s", f"{queries} queries", sep="\t")
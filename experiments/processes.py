@@ -0,0 +1,45 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from timeit import timeit
+
+from idict import idict
+
+
+# CPU-bound pure Python fields, which do not benefit from threads.
+def burn(x):
+    s = 0
+    for i in range(3_000_000):
+        s += i % (x + 1)
+    return s
+
+
+def build():
+    d = idict(x=3)
+    for i in range(8):
+        d[f"y{i}"] = lambda x: burn(x)
+    return d >> [{}]
+
+
+for backend in ["thread", "process"]:
+    d = build()
+    t = timeit(lambda: d.evaluate(workers=8, backend=backend), number=1)
+    print(backend, f"{t:.2f}s", sep="\t")
@@ -0,0 +1,45 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+import os
+from timeit import timeit
+
+from idict import idict
+from idict.persistence.sqla import SQLA
+
+
+# Persisting a 30-field idict into a SQLite file.
+class SQLAPerItem(SQLA):
+    """SQLA without bulk writes, i.e., one session and one commit per value"""
+
+    setmany = property()  # Hide the method from hasattr().
+
+
+def store(cache_class):
+    if os.path.exists(path := "/tmp/setmany-test.db"):
+        os.remove(path)
+    cache = cache_class(f"sqlite+pysqlite:///{path}")
+    d = idict({f"f{i}": i for i in range(30)})
+    return timeit(lambda: d >> [cache], number=1)
+
+
+print("per item", f"{store(SQLAPerItem):.2f}s", sep="\t")
+print("setmany", f"{store(SQLA):.2f}s", sep="\t")
@@ -0,0 +1,51 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+import os
+from timeit import timeit
+
+from idict import idict
+from idict.persistence.sqla import SQLA
+from idict.persistence.tiered import Tiered
+
+# Rebuilding (100 times) a 40-field idict from a SQLite file, with and without an in-memory tier.
+if os.path.exists(path := "/tmp/tiered-test.db"):
+    os.remove(path)
+backend = SQLA(f"sqlite+pysqlite:///{path}")
+d = idict({f"f{i}": i for i in range(40)}) >> [backend]
+for cache in [backend, Tiered(backend)]:
+    t = timeit(lambda: idict.fromid(d.id, cache).evaluated, number=100)
+    print(cache.__class__.__name__, f"{t:.2f}s", sep="\t")
+print(cache.stats)
+
+# Storing 100 idicts, writing each one at once (write-through) or all of them at the end (write-back).
+for writeback in [False, True]:
+    os.remove(path)
+    backend = SQLA(f"sqlite+pysqlite:///{path}")
+    cache = Tiered(backend, writeback=writeback)
+
+    def store():
+        with cache:  # Pending values are written at the end of the block.
+            for i in range(100):
+                idict(x=i, y=-i) >> [cache]
+
+    t = timeit(store, number=1)
+    print(f"writeback={writeback}", f"{t:.2f}s", len(list(backend.keys())), sep="\t")
@@ -19,6 +19,8 @@
 #  works or verbatim, obfuscated, compiled or rewritten versions of any
 #  part of this work is illegal and unethical regarding the effort and
 #  time spent here.
+import os
+from collections import OrderedDict
 from pathlib import Path
 from typing import TypeVar, Dict, Union
 
@@ -28,13 +30,44 @@ VT = TypeVar("VT")
 
 GLOBAL = {
     "cache": Disk(f"{Path.home()}/{'.idict/shelve.db'}"),
-    "compression_cache": {},
+    "compression_cache": OrderedDict(),
     "compression_cachesize": 0,
     "compression_cachelimit": 1_000_000_000,
+    "value_memo": False,
+    "hashing": "lz4",
+    "hashing_threads": min(8, os.cpu_count() or 1),
+    "parallel_hashing_threshold": 10_000_000,
+    "streaming_threshold": 100_000_000,
+    "streaming_compression": True,
+    "function_hashing": "clean",
+    "fhosh_cachelimit": 100_000,
+    "lazy_identity": False,
+    "merkle_chunk_rows": 1_000_000,
+    "interning": False,
+    "tracer": None,
+    "pointers_cachelimit": 100_000,
+    "pointer_compression": False,
 }
 
 
-def setup(cache: Union[Disk, Dict[str, VT]] = None, compression_cachelimit_MB: float = None):
+def setup(
+    cache: Union[Disk, Dict[str, VT]] = None,
+    compression_cachelimit_MB: float = None,
+    value_memo: bool = None,
+    hashing: str = None,
+    hashing_threads: int = None,
+    parallel_hashing_threshold_MB: float = None,
+    streaming_threshold_MB: float = None,
+    streaming_compression: bool = None,
+    function_hashing: str = None,
+    fhosh_cachelimit: int = None,
+    lazy_identity: bool = None,
+    merkle_chunk_rows: int = None,
+    interning: bool = None,
+    tracer=None,
+    pointers_cachelimit: int = None,
+    pointer_compression: bool = None,
+):
     """
     Global behavior of idict
 
@@ -42,11 +75,98 @@ def setup(cache: Union[Disk, Dict[str, VT]] = None, compression_cachelimit_MB: f
     ----------
     cache
         Dict-like storage accessed through '^' operator.
+        E.g., 'Tiered(Disk(...))' keeps recently used values in memory, see 'idict.persistence.tiered.Tiered'.
     compression_cachelimit_MB
-        Amount of MBs reserved for keeping compressed values in memory.
+        Amount of MBs reserved for keeping compressed values (and their hashes) in memory.
         Higher values accelerate persisting original values as compression is already done at hashing.
+        They also avoid serializing and hashing again a same object inserted into many idicts (see 'value_memo').
+    value_memo
+        Reuse the blob and hash of the very same object (by identity) when it is inserted into many idicts or stored.
+        Disabled by default: a value mutated in place after insertion would keep its old id.
+        Only enable it if values (e.g., numpy arrays, DataFrames) are never mutated in place.
+    hashing
+        How values are serialized to be hashed. Each mode induces its own ids, so they should not be mixed.
+        'lz4': hash the compressed blob (default, compatible with ids from previous versions).
+        'pickle': hash the raw pickle stream; compression is postponed until the value is actually stored.
+        'typed': hash values of registered types (scalars, str, bytes, numpy arrays, pandas frames) directly;
+        other values are hashed as in 'lz4' mode. See 'idict.core.identification.register_hasher()'.
+        DataFrames and 2-D arrays are hashed column-wise (Merkle-style), see 'merkle_chunk_rows'.
+    hashing_threads
+        Maximum number of threads to serialize and hash values of a new idict. Use 1 to disable parallel hashing.
+    parallel_hashing_threshold_MB
+        Minimum (estimated) amount of MBs of values to be hashed, before starting threads.
+    streaming_threshold_MB
+        Minimum (estimated) size in MBs of a value to be hashed while being pickled, chunk by chunk,
+        instead of materializing its whole dump. Only applies to the 'pickle' hashing mode,
+        since lz4 frames compressed by parts are not guaranteed to match the ones compressed at once.
+    streaming_compression
+        Whether the streamed value should be compressed along the way, to keep its blob ready for storage.
+        Otherwise, the value is serialized again only if it is stored.
+    function_hashing
+        How functions are converted to bytes to be hashed. Each approach induces its own ids.
+        'clean': disassembled bytecode text without line numbers (default, compatible with previous versions).
+        'code': bytecode and referred names taken directly from the code object; faster and
+        insensitive to memory addresses of nested functions.
+    fhosh_cachelimit
+        Maximum number of function hoshes kept in memory (LRU), keyed by code object and default values.
+    lazy_identity
+        Postpone hashing of the values of a new idict until its id, ids, hosh, blobs, etc. are actually needed,
+        e.g., to apply a function, to compare, to show, or to store it.
+        Hashing settings in effect at that moment are the ones that apply.
+    merkle_chunk_rows
+        Number of rows of each leaf when hashing columns of DataFrames and 2-D arrays in 'typed' mode.
+        Each column digest combines the digests of its chunks; the value digest combines the column digests.
+        The chunk size is hashed along, so each setting induces its own ids.
+        Column digests are reused for views of an already hashed frame (e.g., 'df.iloc[:, :2]') only with 'value_memo'.
+    interning
+        Keep a process-wide weak table of idicts by id, so that creating (or building from cache) an idict whose id
+        is already alive in memory returns the existing frozen instance. Equal idicts then share values,
+        internals and evaluated fields, and comparing them is a pointer check.
+    tracer
+        Tracer (see 'idict.core.tracing.Tracer') to collect timed events of hashing, evaluation of functions,
+        pack/unpack and cache accesses. Use False to stop tracing.
+    pointers_cachelimit
+        Maximum number of pointers (e.g., fields holding nested idicts) whose final target is kept in memory,
+        so that fetching them again costs a single cache lookup instead of one per hop. Use 0 to disable.
+    pointer_compression
+        Rewrite in the cache each chain of two or more pointers that is followed, to point directly to its target.
     """
     if cache is not None:
         GLOBAL["cache"] = cache
     if compression_cachelimit_MB is not None:
         GLOBAL["compression_cachelimit"] = int(compression_cachelimit_MB * 1_000_000)
+    if value_memo is not None:
+        GLOBAL["value_memo"] = value_memo
+    if hashing is not None:
+        if hashing not in ["lz4", "pickle", "typed"]:  # pragma: no cover
+            raise Exception(f"Unknown hashing mode: {hashing}. Expected: 'lz4', 'pickle' or 'typed'.")
+        GLOBAL["hashing"] = hashing
+    if hashing_threads is not None:
+        GLOBAL["hashing_threads"] = hashing_threads
+    if parallel_hashing_threshold_MB is not None:
+        GLOBAL["parallel_hashing_threshold"] = int(parallel_hashing_threshold_MB * 1_000_000)
+    if streaming_threshold_MB is not None:
+        GLOBAL["streaming_threshold"] = int(streaming_threshold_MB * 1_000_000)
+    if streaming_compression is not None:
+        GLOBAL["streaming_compression"] = streaming_compression
+    if function_hashing is not None:
+        if function_hashing not in ["clean", "code"]:  # pragma: no cover
+            raise Exception(f"Unknown function hashing approach: {function_hashing}. Expected: 'clean' or 'code'.")
+        GLOBAL["function_hashing"] = function_hashing
+    if fhosh_cachelimit is not None:
+        GLOBAL["fhosh_cachelimit"] = fhosh_cachelimit
+    if lazy_identity is not None:
+        GLOBAL["lazy_identity"] = lazy_identity
+    if merkle_chunk_rows is not None:
+        GLOBAL["merkle_chunk_rows"] = merkle_chunk_rows
+    if interning is not None:
+        GLOBAL["interning"] = interning
+    if tracer is not None:
+        GLOBAL["tracer"] = tracer or None
+    if pointers_cachelimit is not None:
+        GLOBAL["pointers_cachelimit"] = pointers_cachelimit
+        from idict.persistence.pointers import trim
+
+        trim()
+    if pointer_compression is not None:
+        GLOBAL["pointer_compression"] = pointer_compression
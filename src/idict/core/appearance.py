@@ -72,6 +72,9 @@ def idict2txt(d, all, history):
 
 def idict2dict(d, all, history):
     # from ldict.core.base import AbstractLazyDict
+    from idict.core.idict_ import Idict
+
+    (d.frozen if isinstance(d, Idict) else d).identified  # Ids should be ready before copying the data.
     dic = d.data.copy()
     if not history and "_history" in dic and isinstance(dic["_history"], dict):
         dic["_history"] = " ".join(Hosh.fromid(k).id for k in dic["_history"])
@@ -0,0 +1,145 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from collections.abc import Mapping
+from weakref import WeakValueDictionary
+
+from garoupa import ø40
+
+layouts = WeakValueDictionary()
+"""Key tables shared by all compact idicts having the same fields (in the same order) and identity"""
+
+
+class Layout:
+    __slots__ = ("keys", "index", "identity", "__weakref__")
+
+    def __init__(self, keys, identity):
+        self.keys = keys
+        self.index = {k: i for i, k in enumerate(keys)}
+        self.identity = identity
+
+    @staticmethod
+    def interned(keys, identity):
+        tag = keys, identity.digits, identity.id
+        if (layout := layouts.get(tag)) is None:
+            layouts[tag] = layout = Layout(keys, identity)
+        return layout
+
+
+class CompactIdict(Mapping):
+    """
+    Read-only and memory-lean snapshot of an idict, intended to hold many records in memory
+
+    Field names are kept in a table shared by all records with the same layout, values in a tuple and ids
+    as a single bytes object. Blobs and hashes are not kept: they are recalculated if needed.
+    Lazy fields are evaluated when the snapshot is taken.
+
+    >>> from idict import idict
+    >>> a = idict(x=1, y=2).compact
+    >>> b = (idict(x=3, y=4) >> (lambda x, y: {"z": x + y})).compact
+    >>> c = idict(x=5, y=6).compact
+    >>> a["x"], a.y, len(a), list(a), b.z
+    (1, 2, 2, ['x', 'y'], 7)
+    >>> a.layout is c.layout, a.layout is b.layout
+    (True, False)
+    >>> a.id == idict(x=1, y=2).id, a.ids == idict(x=1, y=2).ids
+    (True, True)
+    >>> a.asidict == idict(x=1, y=2), a == idict(x=1, y=2).compact, a == c
+    (True, True, False)
+    >>> a.asidict.show(colored=False)
+    {
+        "x": 1,
+        "y": 2,
+        "_id": "5G_358b45f49c547174eb4bd687079b30cbbe724",
+        "_ids": {
+            "x": "fH_5142f0a4338a1da2ca3159e2d1011981ac890",
+            "y": "S-_074b5a806933d64f111a93af359a278402f83"
+        }
+    }
+    >>> import pickle
+    >>> pickle.loads(pickle.dumps(b)).layout is b.layout
+    True
+    """
+
+    __slots__ = ("layout", "row", "rawids")
+
+    def __init__(self, keys, values, rawids, identity=ø40):
+        self.layout = Layout.interned(tuple(keys), identity)
+        self.row = tuple(values)
+        self.rawids = rawids
+
+    @staticmethod
+    def fromidict(d):
+        """Snapshot of a (frozen or mutable) idict"""
+        d.evaluate()
+        keys = tuple(k for k in d.data if k not in ["_id", "_ids"])
+        rawids = "".join([d.ids[k] for k in keys] + [d.id]).encode()
+        return CompactIdict(keys, (d.data[k] for k in keys), rawids, d.identity)
+
+    @property
+    def identity(self):
+        return self.layout.identity
+
+    @property
+    def id(self):
+        return self.rawids[-self.identity.digits :].decode()
+
+    @property
+    def ids(self):
+        n, ids = self.identity.digits, self.rawids.decode()
+        return {k: ids[i * n : (i + 1) * n] for i, k in enumerate(self.layout.keys)}
+
+    @property
+    def asidict(self):
+        from idict.core.idict_ import Idict
+
+        return Idict(dict(zip(self.layout.keys, self.row)), _id=self.id, _ids=self.ids, identity=self.identity)
+
+    def __getitem__(self, key):
+        return self.row[self.layout.index[key]]
+
+    def __getattr__(self, item):
+        layout = object.__getattribute__(self, "layout")
+        if item in layout.index:
+            return self.row[layout.index[item]]
+        if (_item := "_" + item) in layout.index:
+            return self.row[layout.index[_item]]
+        raise AttributeError(item)
+
+    def __iter__(self):
+        return iter(self.layout.keys)
+
+    def __len__(self):
+        return len(self.row)
+
+    def __eq__(self, other):
+        if isinstance(other, CompactIdict):
+            return self.rawids == other.rawids
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.rawids)
+
+    def __repr__(self):
+        return f"«{self.id}: {', '.join(self.layout.keys)}»"
+
+    def __reduce__(self):
+        return self.__class__, (self.layout.keys, self.row, self.rawids, self.identity)
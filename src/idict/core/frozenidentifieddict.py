@@ -20,18 +20,21 @@
 #  part of this work is illegal and unethical regarding the effort and
 #  time spent here.
 #
+import asyncio
 import operator
 from functools import reduce, cached_property
 from operator import rshift as aop
 from operator import xor as cop
 from random import Random
-from typing import TypeVar, Union, Callable
+from typing import TypeVar, Union, Callable, List
 
 from garoupa import ø40, Hosh
 
 from idict.config import GLOBAL
 from idict.core.appearance import idict2txt
 from idict.core.identification import blobs_hashes_hoshes
+from idict.core.interning import interned
+from idict.core.overlay import Overlay
 from idict.data.load import file2df
 from idict.function.dataset import openml, df2Xy
 from idict.parameter.ifunctionspace import iFunctionSpace, reduce3
@@ -41,6 +44,7 @@ from ldict.core.appearance import decolorize
 from ldict.core.base import AbstractLazyDict, AbstractMutableLazyDict
 from ldict.customjson import CustomJSONEncoder
 from ldict.frozenlazydict import FrozenLazyDict
+from ldict.lazyval import LazyVal
 
 VT = TypeVar("VT")
 
@@ -209,7 +213,8 @@ class FrozenIdentifiedDict(AbstractLazyDict):
     }
     """
 
-    hosh: Hosh
+    _internals = None
+    _pending_ids = None
 
     # noinspection PyMissingConstructor
     def __init__(self, /, _dictionary=None, _id=None, _ids=None, rnd=None, identity=ø40, _cloned=None, **kwargs):
@@ -218,16 +223,16 @@ class FrozenIdentifiedDict(AbstractLazyDict):
         data = _dictionary or {}
         data.update(kwargs)
 
-        # Freeze mutable *dicts.
-        for k, v in data.items():
-            if isinstance(v, AbstractMutableLazyDict):
-                data[k] = v.frozen
+        # Internals carrying 'ids' come from an operation over a parent idict, whose values are already frozen.
+        derived = _cloned and "ids" in _cloned
+        if not derived:
+            # Freeze mutable *dicts.
+            for k, v in data.items():
+                if isinstance(v, AbstractMutableLazyDict):
+                    data[k] = v.frozen
 
         if _cloned:
-            self.blobs = _cloned["blobs"]
-            self.hashes = _cloned["hashes"]
-            self.hoshes = _cloned["hoshes"]
-            self.hosh = _cloned["hosh"]
+            self._internals = dict(_cloned)
         else:
             if "_id" in data:
                 if _id:  # pragma: no cover
@@ -241,33 +246,109 @@ class FrozenIdentifiedDict(AbstractLazyDict):
             if _id:
                 if _ids is None:  # pragma: no cover
                     raise Exception(f"'id' {_id} given, but 'ids' is missing.")
-                self.blobs = {}
-                self.hashes = {}
-                self.hoshes = {k: identity * v for k, v in _ids.items()}
-                hosh = identity * _id
+                hoshes = {k: identity * v for k, v in _ids.items()}
+                self._internals = dict(blobs={}, hashes={}, hoshes=hoshes, hosh=self.product(hoshes))
+                if identity * _id != self._internals["hosh"]:  # pragma: no cover
+                    raise Exception(f"Inconsistent provided id {_id} and calculated id {self.hosh.id}")
+            elif GLOBAL["lazy_identity"]:
+                # Hashing is postponed until some identity-related attribute is needed.
+                self._pending_ids = _ids or {}
+                _id = LazyVal("_id", lambda: self.id, {}, {}, None)
+                _ids = LazyVal("_ids", lambda: self.ids, {}, {}, None)
             else:
-                self.blobs, self.hashes, self.hoshes = blobs_hashes_hoshes(
-                    data, identity, _ids or {}, self.identity.version
-                ).values()
-                hosh = None
-            self.hosh = reduce(operator.mul, [identity] + [v for k, v in self.hoshes.items() if not k.startswith("_")])
-            if hosh and hosh != self.hosh:  # pragma: no cover
-                raise Exception(f"Inconsistent provided id {_id} and calculated id {self.hosh.id}")
-
-        if _id is None:
-            _id = self.hosh.id
-            try:
-                _ids = {k: v.id for k, v in self.hoshes.items()}
-            except:  # pragma: no cover
-                print(self.hoshes)
-                raise Exception()
+                self._internals = self.identification(data, _ids or {})
+
+        if self._internals is not None:
+            if _id is None:
+                _id = self.hosh.id
+                _ids = self._internals["ids"] if derived else {k: v.id for k, v in self.hoshes.items()}
+            self._internals.update(id=_id, ids=_ids)
 
         # Store as an immutable lazy dict.
         self.frozen = FrozenLazyDict(data, _id=_id, _ids=_ids, rnd=rnd)
         self.data = self.frozen.data
-        self.id = _id
-        self.ids = _ids
-        self.fields = list(k for k in _ids.keys() if not k.startswith("_"))
+
+    @cached_property
+    def fields(self):
+        keys = self.data if self._internals is None else self._internals["ids"]
+        return [k for k in keys if not k.startswith("_")]
+
+    def identification(self, data, ids):
+        blobs, hashes, hoshes = blobs_hashes_hoshes(data, self.identity, ids, self.identity.version).values()
+        return dict(blobs=blobs, hashes=hashes, hoshes=hoshes, hosh=self.product(hoshes))
+
+    def product(self, hoshes):
+        return reduce(operator.mul, [self.identity] + [v for k, v in hoshes.items() if not k.startswith("_")])
+
+    @property
+    def identified(self):
+        """
+        Internals of identification, i.e., blobs, hashes, hoshes, hosh, id and ids
+
+        They are calculated at the first access, when the dict was created in lazy identity mode.
+
+        >>> from idict import setup
+        >>> setup(lazy_identity=True)
+        >>> d = FrozenIdentifiedDict(x=5, y=3)
+        >>> d.data["_id"]
+        →()
+        >>> d.x, d.fields
+        (5, ['x', 'y'])
+        >>> e = d >> {"z": 7}
+        >>> e.data["_id"]  # Still not identified.
+        →()
+        >>> d.id
+        'pl_8763f6625970707cdef7dfd31096db4c63c91'
+        >>> d.data["_id"]
+        'pl_8763f6625970707cdef7dfd31096db4c63c91'
+        >>> e.show(colored=False)
+        {
+            "x": 5,
+            "y": 3,
+            "z": 7,
+            "_id": "m7_b63cbecbe53dbc07a88764ffa68b46de752cb",
+            "_ids": {
+                "x": "GS_cb0fda15eac732cb08351e71fc359058b93bd (content: Mj_3bcd9aefb5020343384ae8ccb88fbd872cd8f)",
+                "y": "Ku_f738128d6e27a03ec6c2e76d23514b4e998e3 (content: S5_331b7e710abd1443cd82d6b5cdafb9f04d5ab)",
+                "z": "ZN_eccacd999c26ce18c98f9a17a6f47adcf162a (content: 3m_131910d18a892d1b64285250092a4967c8065)"
+            }
+        }
+        >>> e == FrozenIdentifiedDict(x=5, y=3, z=7)
+        True
+        >>> setup(lazy_identity=False)
+        """
+        if self._internals is None:
+            data = {k: v for k, v in self.data.items() if k not in ["_id", "_ids"]}
+            internals = self.identification(data, self._pending_ids)
+            internals["id"] = internals["hosh"].id
+            internals["ids"] = {k: v.id for k, v in internals["hoshes"].items()}
+            self.data["_id"], self.data["_ids"] = internals["id"], internals["ids"]
+            self._internals = internals
+        return self._internals
+
+    @property
+    def blobs(self):
+        return self.identified["blobs"]
+
+    @property
+    def hashes(self):
+        return self.identified["hashes"]
+
+    @property
+    def hoshes(self):
+        return self.identified["hoshes"]
+
+    @property
+    def hosh(self) -> Hosh:
+        return self.identified["hosh"]
+
+    @property
+    def id(self):
+        return self.identified["id"]
+
+    @property
+    def ids(self):
+        return self.identified["ids"]
 
     def __getitem__(self, item):
         return self.frozen[item]
@@ -293,8 +374,19 @@ class FrozenIdentifiedDict(AbstractLazyDict):
             return self.frozen[_item]
         return self.__getattribute__(item)
 
-    def evaluate(self):
+    def evaluate(self, workers=None, backend="thread", lean=False, keep=None):
         """
+        Evaluate all lazy fields
+
+        Given a number of 'workers', independent fields are evaluated concurrently by a pool of threads,
+        following the dependencies among them. CPU-bound functions can be called by a pool of processes
+        instead, with backend="process".
+
+        Given lean=True, the fields are evaluated one at a time and each value is released as soon as the fields
+        depending on it are evaluated, keeping only the fields in 'keep' (default: those not used by other lazy
+        fields). Released fields become lazy again, i.e., they are recalculated, or loaded from cache when the idict
+        is cached, if accessed. Ids are not affected.
+
         >>> from idict.core.frozenidentifieddict import FrozenIdentifiedDict as idict
         >>> f = lambda x: {"y": x+2}
         >>> d = idict(x=3)
@@ -320,8 +412,82 @@ class FrozenIdentifiedDict(AbstractLazyDict):
                 "x": "ME_bd0a8d9d8158cdbb9d7d4c7af1659ca1dabc9 (content: S5_331b7e710abd1443cd82d6b5cdafb9f04d5ab)"
             }
         }
+        >>> b = d >> f >> (lambda y: {"z": y * 2}) >> (lambda x, z: {"w": x + z})
+        >>> b.evaluate(lean=True)
+        >>> b.show(colored=False)  # doctest:+ELLIPSIS
+        {
+            "w": 13,
+            "z": "→(y→(x))",
+            "y": "→(x)",
+            "x": 3,
+            "_id": "...",
+            "_ids": {
+                "w": "...",
+                "z": "...",
+                "y": "...",
+                "x": "ME_bd0a8d9d8158cdbb9d7d4c7af1659ca1dabc9 (content: S5_331b7e710abd1443cd82d6b5cdafb9f04d5ab)"
+            }
+        }
+        >>> b.z
+        10
+        """
+        if lean:
+            from idict.core.scheduling import lean_evaluation, evaluation_lean
+
+            lazies = {k: v for k, v in self.data.items() if k not in ["_id", "_ids"] and isinstance(v, LazyVal)}
+            if keep is None:
+                used = {dep for v in lazies.values() for dep in v.deps}
+                keep = [k for k in lazies if k not in used]
+            elif isinstance(keep, str):
+                keep = [keep]
+            token = evaluation_lean.set(True)
+            try:
+                lean_evaluation(list(lazies.values()), [lazies[k] for k in keep if k in lazies])
+            finally:
+                evaluation_lean.reset(token)
+            for k in keep:
+                if k in lazies:
+                    self.data[k] = lazies[k].result
+            return
+        if workers is not None and workers > 1:
+            from idict.core.scheduling import schedule
+
+            lazies = [v for k, v in self.data.items() if k not in ["_id", "_ids"] and isinstance(v, LazyVal)]
+            schedule(lazies, workers, backend)
+        for k in self.data:
+            if k not in ["_id", "_ids"] and isinstance(v := self.frozen[k], AbstractLazyDict):
+                v.evaluate()
+        interned(self)
+
+    async def aevaluate(self, workers=None, backend="thread", lean=False, keep=None, executor=None):
+        """
+        Run evaluate() in an executor (the default one, if none is given), so it does not block the event loop
+
+        This is not an asynchronous evaluation path: functions and cache accesses of lazy fields (see 'cached()')
+        are still blocking calls, made inside the executor thread through the synchronous cache, so their I/O is
+        not overlapped with that of other coroutines. Only loading stored idicts goes through an AsyncCache,
+        see 'afromid()'.
+
+        >>> import asyncio
+        >>> from idict.core.frozenidentifieddict import FrozenIdentifiedDict as idict
+        >>> d = idict(x=3) >> (lambda x: {"y": x + 2})
+        >>> asyncio.run(d.aevaluate())
+        >>> d.show(colored=False)  # doctest:+ELLIPSIS
+        {
+            "y": 5,
+            "x": 3,
+            "_id": "...",
+            "_ids": {
+                "y": "...",
+                "x": "..."
+            }
+        }
+        >>> b = idict(x=3) >> (lambda x: {"y": x + 2}) >> (lambda y: {"z": y * 2})
+        >>> asyncio.run(b.aevaluate(lean=True))
+        >>> b.data["z"], isinstance(b.data["y"], LazyVal)
+        (10, True)
         """
-        self.frozen.evaluate()
+        await asyncio.get_running_loop().run_in_executor(executor, self.evaluate, workers, backend, lean, keep)
 
     @cached_property
     def asdict(self):
@@ -339,8 +505,14 @@ class FrozenIdentifiedDict(AbstractLazyDict):
         return self.frozen.asdict
 
     def clone(self, data=None, rnd=None, _cloned=None):
+        if self._internals is None and data is None and _cloned is None:
+            data = {k: v for k, v in self.data.items() if k not in ["_id", "_ids"]}
+            ids = {k: v for k, v in self._pending_ids.items() if k in data}
+            return FrozenIdentifiedDict(data, _ids=ids, rnd=rnd or self.rnd, identity=self.identity)
         data = data or self.data
-        _cloned = _cloned or dict(blobs=self.blobs, hashes=self.hashes, hoshes=self.hoshes, hosh=self.hosh)
+        _cloned = _cloned or dict(
+            blobs=self.blobs, hashes=self.hashes, hoshes=self.hoshes, hosh=self.hosh, ids=self.ids
+        )
         return FrozenIdentifiedDict(data, rnd=rnd or self.rnd, identity=self.identity, _cloned=_cloned)
 
     def __hash__(self):
@@ -392,13 +564,15 @@ class FrozenIdentifiedDict(AbstractLazyDict):
         return self.__repr__(all=True)
 
     def __eq__(self, other):
+        from idict.core.idict_ import Idict
+
+        if self is other or isinstance(other, Idict) and other.frozen is self:
+            return True
         if isinstance(other, dict):
             if "_id" in other:
                 return self.id == other["_id"]
             if list(self.keys())[:-2] != list(other.keys()):
                 return False
-        from idict.core.idict_ import Idict
-
         if isinstance(other, (FrozenIdentifiedDict, Idict)):
             return self.hosh == other.hosh
         if isinstance(other, AbstractLazyDict):
@@ -427,6 +601,7 @@ class FrozenIdentifiedDict(AbstractLazyDict):
     ):
         from idict.core.rshift import application, ihandle_dict
         from idict.core.idict_ import Idict
+        from idict.core.ipipeline import iPipeline
 
         if isinstance(other, list):
             d = self
@@ -441,26 +616,26 @@ class FrozenIdentifiedDict(AbstractLazyDict):
                 d = cached(d, cache)
             return d
         if isinstance(other, (Idict, FrozenIdentifiedDict)):
-            clone = self.clone(rnd=other.rnd) if other.rnd else self.clone()
+            data = {k: v for k, v in self.data.items() if k not in ["_id", "_ids"]}
+            blobs, hashes, hoshes = Overlay(self.blobs), Overlay(self.hashes), Overlay(self.hoshes)
             for k, v in other.data.items():
                 if k not in ["_id", "_ids"]:
-                    clone.data[k] = v
+                    data[k] = v
                     if k in other.blobs:
-                        clone.blobs[k] = other.blobs[k]
+                        blobs[k] = other.blobs[k]
                     if k in other.hashes:
-                        clone.hashes[k] = other.hashes[k]
-                    clone.hoshes[k] = other.hoshes[k]
-            hosh = reduce(operator.mul, [self.identity] + [v for k, v in clone.hoshes.items() if not k.startswith("_")])
-            internals = dict(blobs=clone.blobs, hashes=clone.hashes, hoshes=clone.hoshes, hosh=hosh)
-            del clone.data["_id"]
-            del clone.data["_ids"]
-            return FrozenIdentifiedDict(clone.data, rnd=clone.rnd, identity=self.identity, _cloned=internals, **{k: v})
+                        hashes[k] = other.hashes[k]
+                    hoshes[k] = other.hoshes[k]
+            internals = dict(blobs=blobs, hashes=hashes, hoshes=hoshes, hosh=self.product(hoshes))
+            return FrozenIdentifiedDict(data, rnd=other.rnd or self.rnd, identity=self.identity, _cloned=internals)
         if isinstance(other, dict):
             return ihandle_dict(self, other)
         if isinstance(other, Random):
             return self.clone(rnd=other)
         if isinstance(other, iLet):
             return application(self, other, other.f, other.bytes)
+        if isinstance(other, iPipeline):
+            return other(self)
         if callable(other):
             return application(self, other, other, self.identity)
         if isinstance(other, iFunctionSpace):
@@ -487,9 +662,9 @@ class FrozenIdentifiedDict(AbstractLazyDict):
     def trimmed(self):
         ids = self.ids.copy()
         data = self.data.copy()
-        blobs = self.blobs.copy()
-        hashes = self.hashes.copy()
-        hoshes = self.hoshes.copy()
+        blobs = Overlay(self.blobs)
+        hashes = Overlay(self.hashes)
+        hoshes = Overlay(self.hoshes)
         for k in self.ids:
             if k.startswith("_"):
                 del ids[k]
@@ -500,7 +675,7 @@ class FrozenIdentifiedDict(AbstractLazyDict):
                     del hashes[k]
                 del hoshes[k]
         data["_ids"] = ids
-        cloned_internals = dict(blobs=blobs, hashes=hashes, hoshes=hoshes, hosh=self.hosh)
+        cloned_internals = dict(blobs=blobs, hashes=hashes, hoshes=hoshes, hosh=self.hosh, ids=ids)
         return self.clone(data, _cloned=cloned_internals)
 
     # def wrapped(self, version, version_id):
@@ -561,12 +736,94 @@ class FrozenIdentifiedDict(AbstractLazyDict):
             id2 = (id * cache.user_hosh).id
         else:
             id2 = "_" + id[1:]
-        val = get_following_pointers(id2, cache)
+        val = get_following_pointers(id2, cache, None)
         isdescriptor = isinstance(val, dict) and "_id" in val and "_ids" in val
         if val is None or not isdescriptor:  # pragma: no cover
             raise Exception(f"Could not find {id} / {id2}")
         return build(val["_id"], val["_ids"], cache, identity)
 
+    @staticmethod
+    async def afromid(id, cache, identity=ø40) -> "FrozenIdentifiedDict":
+        """
+        Asynchronous version of fromid(), fetching the values concurrently
+
+        A synchronous cache is wrapped by an AsyncCache, i.e., accessed through an executor.
+
+        >>> import asyncio
+        >>> from idict import idict
+        >>> cache = {}
+        >>> d = idict(x=5) >> (lambda x: {"y": x**2}) >> [cache]
+        >>> d.evaluate()
+        >>> d2 = asyncio.run(idict.afromid(d.id, cache))
+        >>> d2.y, d2 == d
+        (25, True)
+        """
+        from idict.persistence.asynccache import asynccache
+        from idict.persistence.cached import abuild, aget_following_pointers
+
+        cache = asynccache(cache)
+        if hasattr(cache, "user_hosh") and not id.startswith("_"):
+            id2 = (id * cache.user_hosh).id
+        else:
+            id2 = "_" + id[1:]
+        val = await aget_following_pointers(id2, cache, None)
+        isdescriptor = isinstance(val, dict) and "_id" in val and "_ids" in val
+        if val is None or not isdescriptor:  # pragma: no cover
+            raise Exception(f"Could not find {id} / {id2}")
+        return await abuild(val["_id"], val["_ids"], cache, identity)
+
+    @staticmethod
+    def frombatch(records, identity=ø40) -> List["FrozenIdentifiedDict"]:
+        """
+        Build many idicts at once from a list of dicts or from the rows of a DataFrame
+
+        The idicts are the same as building each one separately, e.g., 'idict(**row)'.
+        Blobs, hashes and hoshes of scalar values (int, float, str, bool, bytes, None) are reused
+        along each column.
+
+        >>> from pandas import DataFrame
+        >>> idict = FrozenIdentifiedDict
+        >>> df = DataFrame({"x": [1, 2, 1], "y": ["a", "a", "b"], "_z": [0.5, 0.5, 0.5]})
+        >>> ds = idict.frombatch(df)
+        >>> [d.id for d in ds] == [idict(**row).id for row in df.to_dict("records")]
+        True
+        >>> ds[2].show(colored=False)
+        {
+            "x": 1,
+            "y": "b",
+            "_z": 0.5,
+            "_id": "lR_4e7141793f204665e9bcf9a52fba47b7ff6be",
+            "_ids": {
+                "x": "fH_5142f0a4338a1da2ca3159e2d1011981ac890 (content: l8_09c7059156c4ed2aea46243e9d4b36c01f272)",
+                "y": "6a_724f40d40c9529b22f7ba0c25db93e2653e1e (content: fN_cb06bdaf04951f45164ba516f718bc23e6bd5)",
+                "_z": "lU_8e45530a7992c929b253f523631bac6592457 (content: OH_bb453fd10a3a31a28eceed00a1890c4f0e776)"
+            }
+        }
+        >>> idict.frombatch([{"x": [1]}, {"x": [1], "d": ds[0]}])[1].hoshes["d"] == ds[0].hosh ** b"d"
+        True
+        >>> from idict import idict as mutable
+        >>> row = {"y": 1, "e": mutable(x=5)}
+        >>> d, = idict.frombatch([row])
+        >>> e = idict(**row)
+        >>> d.ids == e.ids, type(d.e) is type(e.e), d.blobs == e.blobs
+        (True, True, True)
+        """
+        if hasattr(records, "to_dict"):  # pandas
+            records = records.to_dict("records")
+        memo, result = {}, []
+        for row in records:
+            data = dict(row)
+            if "_id" in data or "_ids" in data:
+                d = FrozenIdentifiedDict(data, identity=identity)
+            else:
+                internals = blobs_hashes_hoshes(data, identity, {}, identity.version, memo)
+                internals["hosh"] = reduce(
+                    operator.mul, [identity] + [v for k, v in internals["hoshes"].items() if not k.startswith("_")]
+                )
+                d = FrozenIdentifiedDict(data, identity=identity, _cloned=internals)
+            result.append(interned(d))
+        return result
+
     @staticmethod
     def fromfile(name, output=None, output_format="df", include_name=False, identity=ø40):
         """Input format is defined by file extension: .arff, .csv
@@ -691,6 +948,13 @@ class FrozenIdentifiedDict(AbstractLazyDict):
         del dic["_history"]
         return FrozenIdentifiedDict(dic, identity=identity)
 
+    @property
+    def compact(self):
+        """Memory-lean read-only snapshot, see CompactIdict"""
+        from idict.core.compact import CompactIdict
+
+        return CompactIdict.fromidict(self)
+
     @property
     def asmutable(self):
         from idict.core.idict_ import Idict
@@ -698,4 +962,6 @@ class FrozenIdentifiedDict(AbstractLazyDict):
         return Idict(self, identity=self.identity)
 
     def __reduce__(self):
+        if self._internals is None:
+            return self.__class__, ({k: v for k, v in self.data.items() if k not in ["_id", "_ids"]},)
         return self.__class__, ({k: v for k, v in self.data.items()},)
@@ -23,15 +23,37 @@
 
 import dis
 import pickle
+import sys
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from inspect import signature
+from io import BytesIO
+from threading import Lock
+from types import BuiltinFunctionType, CodeType
 
+from blake3 import blake3
 from garoupa import Hosh, UT40_4, Identity
+from garoupa.misc.math import int2cells
 from ldict.exception import NoInputException
 from orjson import dumps
 
-from idict.data.compression import pack, NondeterminismException
+from idict.config import GLOBAL
+from idict.core.tracing import traced
+from idict.data.compression import (
+    dump,
+    NondeterminismException,
+    estimated_size,
+    compress,
+    memoized,
+    memoize,
+    dump_stream,
+    lock,
+)
 
 dill_warned = False
+fhosh_memo = OrderedDict()
 
 
 def f2bin(f, approach):
@@ -43,6 +65,10 @@ def f2bin(f, approach):
     if "_" in fields_and_params:
         return None
 
+    if isinstance(f, partial):
+        return f2bin(f.func, approach) + pickle.dumps((f.args, f.keywords), protocol=5)
+    if isinstance(f, BuiltinFunctionType):
+        return f"{f.__module__}.{f.__qualname__}".encode() + pickle.dumps(fields_and_params, protocol=5)
     if approach == "clean":
         # Remove line numbers.
         groups = [l for l in dis.Bytecode(f).dis().split("\n\n") if l]
@@ -51,6 +77,8 @@ def f2bin(f, approach):
             lines = [segment for segment in group.split(" ") if segment][1:]
             clean_lines.append(lines)
         return dumps(clean_lines) + pickle.dumps(fields_and_params, protocol=5)
+    if approach == "code":
+        return code2bin(f.__code__) + pickle.dumps(fields_and_params, protocol=5)
     if approach == "direct":
         c = f.__code__
         code_bin = c.co_code + str(c.co_consts).encode()
@@ -69,13 +97,44 @@ def f2bin(f, approach):
         return dill.dumps(f)
 
 
-def fhosh(f, version, approach="clean"):
+def code2bin(code):
+    """
+    Bytecode and the names it refers to, without line numbers, function names or memory addresses
+
+    Nested code objects (e.g., inner lambdas and comprehensions) are normalized recursively.
+
+    >>> f, g = (lambda x: [x * i for i in range(3)]), (lambda x: [x * i for i in range(3)])
+    >>> code2bin(f.__code__) == code2bin(g.__code__)
+    True
+    >>> code2bin((lambda x: x + 1).__code__) == code2bin((lambda x: x + 2).__code__)
+    False
+    """
+
+    def normalize(const):
+        if isinstance(const, CodeType):
+            return code2bin(const)
+        if isinstance(const, tuple):
+            return tuple(map(normalize, const))
+        if isinstance(const, frozenset):  # Iteration order of sets depends on the (randomized) hash of strings.
+            return "frozenset", tuple(sorted(repr(normalize(c)) for c in const))
+        return const
+
+    header = (code.co_argcount, code.co_kwonlyargcount, code.co_flags)
+    names = (code.co_names, code.co_varnames, code.co_freevars, code.co_cellvars)
+    return code.co_code + pickle.dumps((header, names, normalize(code.co_consts)), protocol=5)
+
+
+def fhosh(f, version, approach=None):
     """
     Create hosh with etype="ordered" using bytecode of "f" as binary content for blake3.
 
     For some insight on the algorithm choice inside GaROUPa, see, e.g.:
     https://news.ycombinator.com/item?id=22021984
 
+    The result is memoized process-wide by code object and default values,
+    so recreating a same function (e.g., a lambda inside a loop) does not trigger a new analysis of its bytecode.
+    When it is possible, the hosh is also stored as an attribute of the function.
+
     Usage:
 
     >>> print(fhosh(lambda x: {"z": x**2}, UT40_4))
@@ -84,10 +143,22 @@ def fhosh(f, version, approach="clean"):
     >>> print(fhosh(lambda x, name=[1, 2, Ellipsis, ..., 10]: {"z": x**2}, UT40_4))
     3NPAab2SC5lsIz5ekeIQMeQU9EKRW1dYvpUsywyr
 
+    >>> print(fhosh(lambda x: {"z": x**2}, UT40_4, approach="code"))
+    -Zj1Gm5AP8LbNk8mXagtd-dV5imTAyj.EOiLniOh
+
+    >>> from functools import partial
+    >>> print(fhosh(partial(lambda x, y: {"z": x * y}, y=2), UT40_4))
+    ksCrv3B6CGabaxxDIiBwC67NBgCcnPUYIJtuLb7i
+    >>> print(fhosh(abs, UT40_4))
+    iN66yhETj9MJBpNRNuUl5BM14iAh4fFqX1E-EPii
+
     Parameters
     ----------
     f
     version
+    approach
+        How to convert the function to bytes: 'clean', 'code', 'direct' or 'dill'.
+        Default: GLOBAL["function_hashing"], see 'setup()'.
 
     Returns
     -------
@@ -95,15 +166,43 @@ def fhosh(f, version, approach="clean"):
     """
     if hasattr(f, "hosh"):
         return f.hosh
-    if (bin := f2bin(f, approach)) is None:
-        f.hosh = Identity(version=version)
-    else:
-        f.hosh = Hosh(bin, "ordered", version=version)
-    return f.hosh
+    approach = approach or GLOBAL["function_hashing"]
+    key = None
+    if (code := getattr(f, "__code__", None)) is not None:
+        try:
+            defaults = pickle.dumps((f.__defaults__, f.__kwdefaults__), protocol=5)
+            key = code, defaults, approach, version
+        except Exception:  # pragma: no cover
+            pass  # Unpicklable defaults cannot be part of the key.
+    hosh = None
+    if key is not None:
+        with lock:  # Functions can be hashed concurrently, see 'hashing_threads' at 'setup()'.
+            if (hosh := fhosh_memo.get(key)) is not None:
+                fhosh_memo.move_to_end(key)
+    if hosh is None:
+        if (bin := f2bin(f, approach)) is None:
+            hosh = Identity(version=version)
+        else:
+            hosh = Hosh(bin, "ordered", version=version)
+        if key is not None:
+            with lock:
+                fhosh_memo[key] = hosh
+                while len(fhosh_memo) > GLOBAL["fhosh_cachelimit"]:
+                    fhosh_memo.popitem(last=False)
+    try:
+        f.hosh = hosh
+    except AttributeError:
+        pass  # Bound methods, builtins, etc.
+    return hosh
 
 
-def blobs_hashes_hoshes(data, identity, ids, version):
-    """
+def blobs_hashes_hoshes(data, identity, ids, version, memo=None):
+    r"""
+    Blobs, hashes and hoshes of the fields, except hashes and blobs of those with known 'ids'
+
+    Given a 'memo' dict, scalar values (see 'valuekey()') already seen in the same field are not hashed again,
+    e.g., along the rows of a batch, see 'frombatch()'.
+
     >>> from idict import idict
     >>> idict(x=1, y=2, z=3, _ids={"y": "yyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyy"}).show(colored=False)
     {
@@ -117,30 +216,451 @@ def blobs_hashes_hoshes(data, identity, ids, version):
             "z": "Nx_e12377018e5ab54023f91f7c6b7aea6676b60 (content: S5_331b7e710abd1443cd82d6b5cdafb9f04d5ab)"
         }
     }
+    >>> from idict import setup
+    >>> setup(hashing="pickle")  # Hash the raw pickle stream, the blob is compressed only when stored.
+    >>> d = idict(x=1)
+    >>> d.blobs["x"]
+    b'pckl_\x80\x05K\x01.'
+    >>> d.show(colored=False)
+    {
+        "x": 1,
+        "_id": "d._1d53aac6295867a1b165917f7075c9152c7ae",
+        "_ids": {
+            "x": "d._1d53aac6295867a1b165917f7075c9152c7ae"
+        }
+    }
+    >>> setup(hashing="lz4")
     """
     from idict.core.frozenidentifieddict import FrozenIdentifiedDict
     from idict.core.idict_ import Idict
 
+    mode = GLOBAL["hashing"]
+
+    def hashed(k):
+        with traced("hashing", "blob_hash", k) as event:
+            blob, hash = blob_hash(data[k], identity, version, mode)
+            event["nbytes"] = 0 if blob is None else len(blob)
+        return blob, hash
+
+    known = {}
+    if memo is not None:
+        for k, v in data.items():
+            if k not in ids and (key := valuekey(v)) is not None and (entry := memo.get((k, key))) is not None:
+                known[k] = entry
+    fields = [
+        k
+        for k, v in data.items()
+        if k not in ids and k not in known and not isinstance(v, (Idict, FrozenIdentifiedDict))
+    ]
+    threads = min(GLOBAL["hashing_threads"], len(fields))
+    if threads > 1 and sum(map(estimated_size, (data[k] for k in fields))) >= GLOBAL["parallel_hashing_threshold"]:
+        # Serialization holds the GIL, but lz4 and blake3 release it for large buffers.
+        with ThreadPoolExecutor(threads) as executor:
+            results = dict(zip(fields, executor.map(hashed, fields)))
+    else:
+        results = {k: hashed(k) for k in fields}
+
     blobs = {}
     hashes = {}
     hoshes = {}
     for k, v in data.items():
         if k in ids:
             hoshes[k] = identity * ids[k]
+        elif k in known:
+            blob, hashes[k], hoshes[k] = known[k]
+            if blob is not None:
+                blobs[k] = blob
         else:
             if isinstance(v, (Idict, FrozenIdentifiedDict)):
                 hashes[k] = v.hosh
             else:
-                try:
-                    blobs[k] = pack(v)
-                    vhosh = identity.h * blobs[k]
-                except NondeterminismException:
-                    vhosh = fhosh(v, version)
-                hashes[k] = vhosh
+                blob, hashes[k] = results[k]
+                if blob is not None:
+                    blobs[k] = blob
             try:
                 hoshes[k] = hashes[k] ** k.encode()
             except KeyError as e:  # pragma: no cover
                 raise Exception(
                     f"{str(e)} is not allowed in field name: {k}. It is only accepted as the first character to indicate a metafield."
                 )
+            if memo is not None and (key := valuekey(v)) is not None:
+                memo[(k, key)] = blobs.get(k), hashes[k], hoshes[k]
     return dict(blobs=blobs, hashes=hashes, hoshes=hoshes)
+
+
+def blob_hash(value, identity, version, mode="lz4"):
+    """
+    Serialize and hash a value; non serializable values (i.e., functions) are hashed through their bytecode
+
+    The result is memoized for the very same object, if enabled, see 'value_memo' at 'setup()'.
+    Huge values are streamed in 'pickle' mode, see 'streaming_threshold_MB' at 'setup()'.
+    Values of registered types are hashed directly in 'typed' mode, see 'register_hasher()'.
+
+    >>> from garoupa import ø40
+    >>> blob, hash = blob_hash(1, ø40, ø40.version)
+    >>> print(hash)
+    l8_09c7059156c4ed2aea46243e9d4b36c01f272
+    >>> blob_hash(lambda x: x, ø40, ø40.version)[0] is None
+    True
+    >>> import numpy as np
+    >>> from idict import setup
+    >>> setup(value_memo=True)
+    >>> a = np.arange(10)
+    >>> blob_hash(a, ø40, ø40.version)[0] is blob_hash(a, ø40, ø40.version)[0]
+    True
+    >>> setup(value_memo=False)
+    """
+    if mode == "typed":
+        if (hash := typed_hash(value, identity, version)) is not None:
+            return None, hash  # The value is serialized only if it is stored.
+        mode = "lz4"
+    entry = memoized(value, mode)
+    if entry is not None and version not in entry["hashes"] and entry["blob"][5:6] != b"\x80" and mode == "pickle":
+        entry = None  # The hash of a streamed value should be taken from the raw stream, not from its stored blob.
+    if entry is None:
+        if mode == "pickle" and estimated_size(value) >= GLOBAL["streaming_threshold"]:
+            try:
+                blob, hash = stream_hash(value, identity, version, GLOBAL["streaming_compression"])
+            except (pickle.PicklingError, TypeError, AttributeError):
+                pass  # Not picklable; dump() below falls back to dill or to function hashing.
+            else:
+                if blob is not None and (entry := memoize(value, mode, blob)) is not None:
+                    entry["hashes"][version] = hash
+                return blob, hash
+        try:
+            blob = dump(value)
+        except NondeterminismException:
+            return None, fhosh(value, version)
+        if mode == "lz4":
+            blob = compress(blob)
+        entry = memoize(value, mode, blob) or {"blob": blob, "hashes": {}}
+    if version not in entry["hashes"]:
+        entry["hashes"][version] = identity.h * entry["blob"]
+    return entry["blob"], entry["hashes"][version]
+
+
+def valuekey(value):
+    """
+    Hashable key identifying a scalar value along with its type; None for other values
+
+    Floats are represented textually, to tell apart 0.0 and -0.0.
+
+    >>> valuekey(1) == valuekey(1.0)
+    False
+    >>> valuekey(0.0) == valuekey(-0.0)
+    False
+    >>> valuekey([1]) is None
+    True
+    """
+    t = type(value)
+    if t is float:
+        return t, repr(value)
+    if t in (int, str, bool, bytes, type(None)):
+        return t, value
+    return None
+
+
+def stream_hash(value, identity, version, compressed=True):
+    r"""
+    Hash the pickle stream of a value chunk by chunk, as in 'pickle' mode, without materializing the whole dump
+
+    The blob is compressed along the way to be stored later; it is not kept when 'compressed=False'.
+
+    >>> from garoupa import ø40
+    >>> import numpy as np
+    >>> a = np.arange(1_000_000)
+    >>> blob, hash = stream_hash(a, ø40, ø40.version)
+    >>> hash == ø40.h * dump(a)
+    True
+    >>> from idict.data.compression import unpack
+    >>> (unpack(blob) == a).all()
+    True
+    >>> stream_hash(a, ø40, ø40.version, compressed=False)[0] is None
+    True
+    """
+    import lz4.frame as lz4
+
+    hasher = blake3()
+    if compressed:
+        compressor = lz4.LZ4FrameCompressor()
+        header = compressor.begin()
+        file = BytesIO()
+
+        def write(chunk):
+            hasher.update(chunk)
+            # The prefix comes first and is kept uncompressed.
+            file.write(compressor.compress(chunk) if file.tell() else bytes(chunk) + header)
+
+        dump_stream(value, write)
+        file.write(compressor.flush())
+        blob = file.getvalue()
+    else:
+        dump_stream(value, hasher.update)
+        blob = None
+    return blob, identity.h * hosh_fromdigest(hasher.digest(length=version[4]), "hybrid", version)
+
+
+def register_hasher(type, hasher, version=1):
+    """
+    Add a type-specialized hasher, to be used in 'typed' mode before falling back to the pickle+lz4 blob
+
+    The type can be given as a string "module.name" of its public import path, avoiding imports of optional
+    packages; it is resolved once the module is imported. Subclasses are hashed by the hasher of their closest
+    registered ancestor.
+    The hasher should return a list of bytes-like parts, or None to fall back.
+    The type name (as given, or "module.qualname" for a class) and the version are hashed along with the parts;
+    so, changing the bytes produced by a hasher should come with a new version.
+
+    >>> from garoupa import ø40
+    >>> class Celsius(float):
+    ...     pass
+    >>> register_hasher(Celsius, lambda v: [v.hex().encode()])
+    >>> typed_hash(Celsius(36.5), ø40, ø40.version) == typed_hash(36.5, ø40, ø40.version)
+    False
+    >>> del hashers[Celsius]
+    """
+    if isinstance(type, str):
+        pending[type] = hasher, version
+    else:
+        hashers[type] = typename(type), hasher, version
+
+
+def typename(type):
+    return f"{type.__module__}.{type.__qualname__}"
+
+
+def hasher_of(type):
+    """
+    Name, hasher and version registered for the type or its closest ancestor, if any
+
+    >>> from pandas import DataFrame
+    >>> class Frame(DataFrame):
+    ...     pass
+    >>> hasher_of(Frame)[0], hasher_of(bool)[0], hasher_of(list)
+    ('pandas.DataFrame', 'builtins.bool', None)
+    """
+    if pending:
+        for name in list(pending):
+            module, _, attr = name.rpartition(".")
+            if module in sys.modules and (cls := getattr(sys.modules[module], attr, None)) is not None:
+                hashers[cls] = (name, *pending.pop(name))
+    for cls in type.__mro__:
+        if (item := hashers.get(cls)) is not None:
+            return item
+    return None
+
+
+def typed_hash(value, identity, version):
+    r"""
+    Hash a value through the type-specialized hasher registered for its type, see 'hasher_of()'; None if there is none
+
+    >>> from idict import idict, setup
+    >>> setup(hashing="typed")
+    >>> d = idict(x=1, y="1", z=[1])
+    >>> d.blobs.keys()  # Registered types are not serialized at hashing time.
+    dict_keys(['z'])
+    >>> d.show(colored=False)
+    {
+        "x": 1,
+        "y": "1",
+        "z": [
+            1
+        ],
+        "_id": "F8_a53818b34d040aac7ca0d73c59f6b2c876512",
+        "_ids": {
+            "x": "ns_9210939bea602728a6c6420ce3e49b433e82b (content: tV_0b754c73a8246a2dc6db2352cf2fb8dc8030d)",
+            "y": "bm_9bf42f007b95abdeece8bba1843db4dfeb719 (content: kZ_cdcb3b25096a0c61e3b801152f8b33cc7f4d0)",
+            "z": "5m_ba256b48e667b923e8f0ef89f0e462ff3c4dd (content: bW_10bdfc8b200905a38399fddd531a31c4f2f09)"
+        }
+    }
+    >>> import numpy as np
+    >>> a = np.arange(6).reshape(2, 3)
+    >>> idict(a=a).id == idict(a=a.T.copy().T).id != idict(a=a.astype(np.int32)).id
+    True
+    >>> from pandas import DataFrame
+    >>> idict(df=DataFrame({"a": [1, 2]})).blobs
+    {}
+    >>> idict(df=DataFrame({"a": ["1", "2"]})).blobs.keys()  # Object columns fall back to pickle+lz4.
+    dict_keys(['df'])
+    >>> setup(hashing="lz4")
+    """
+    if (item := hasher_of(type(value))) is None:
+        return None
+    name, hasher, hasher_version = item
+    if (parts := hasher(value)) is None:
+        return None
+    h = blake3(f"{name}/{hasher_version}:".encode())
+    for part in parts:
+        h.update(part)
+    return identity.h * hosh_fromdigest(h.digest(length=version[4]), "hybrid", version)
+
+
+def ndarray2parts(a):
+    if a.dtype.hasobject:
+        return None
+    if a.ndim == 2:
+        return [f"{a.dtype.str}{a.shape}".encode()] + [column_digest(a[:, j]) for j in range(a.shape[1])]
+    if not a.flags.c_contiguous:
+        a = a.copy(order="C")
+    return [f"{a.dtype.str}{a.shape}".encode(), a.reshape(-1).view("u1").data]
+
+
+def series2parts(s):
+    """
+    Parts of a Series: name and dtypes of values and index, along with their arrays
+
+    >>> from pandas import Series
+    >>> s = Series([1, 2, 1])
+    >>> series2parts(s) == series2parts(s.astype("category"))
+    False
+    >>> s2 = s.copy()
+    >>> s2.index.name = "i"
+    >>> series2parts(s) == series2parts(s2)
+    False
+    """
+    values = ndarray2parts(s.to_numpy())
+    index = ndarray2parts(s.index.to_numpy())
+    if values is None or index is None:
+        return None
+    return [repr((s.name, str(s.dtype), str(s.index.dtype), list(s.index.names))).encode()] + values + index
+
+
+def dataframe2parts(df):
+    """
+    Merkle-style parts of a DataFrame: the digest of each column, see 'column_digest()'
+
+    The first part describes the frame: column names, dtypes and the names of both axes.
+    Column digests are reused, instead of hashing the column again, only with setup(value_memo=True) and only
+    for columns sharing the buffer of an already hashed one, e.g., 'df.iloc[:, :2]' or 'df["a"]' (see
+    'column_digest()'). Selections that copy the data, like 'df[["a", "b"]]' or 'df.drop(...)' (thus 'df2Xy()'),
+    and frames with appended rows are hashed again. By default, every frame is hashed in full.
+    Caches still store each frame as a single blob.
+
+    >>> from pandas import DataFrame
+    >>> df = DataFrame({"a": [1, 2, 3], "b": [1.5, 2.5, 3.5]})
+    >>> parts = dataframe2parts(df)
+    >>> parts[2:] == [column_digest(df["a"].to_numpy()), column_digest(df["b"].to_numpy())]
+    True
+    >>> dataframe2parts(df[["b"]])[2] == parts[3]  # Sub-hashes are the same in a column selection.
+    True
+    >>> parts == dataframe2parts(df.astype({"a": "category"}))
+    False
+    >>> parts == dataframe2parts(df.rename_axis("i")), parts == dataframe2parts(df.rename_axis("c", axis=1))
+    (False, False)
+    """
+    arrays = [df.index.to_numpy()] + [col.to_numpy() for _, col in df.items()]
+    if any(a.dtype.hasobject for a in arrays):
+        return None
+    header = (
+        list(df.columns),
+        [str(t) for t in df.dtypes],
+        str(df.index.dtype),
+        list(df.index.names),
+        list(df.columns.names),
+    )
+    return [repr(header).encode()] + [column_digest(a) for a in arrays]
+
+
+def column_digest(a):
+    """
+    Digest of a 1-D array, combining the digests of chunks of rows (see 'merkle_chunk_rows' at 'setup()')
+
+    The chunk size is part of the digest, since it changes the result.
+    With setup(value_memo=True), the digest is memoized by memory location while the underlying buffer exists,
+    so views of a same array (e.g., columns of a DataFrame and its slices) are hashed only once.
+    As for the other memos, arrays are then expected not to be mutated in place after being inserted into an idict.
+
+    >>> import numpy as np
+    >>> from idict import setup
+    >>> a = np.arange(10)
+    >>> column_digest(a) == column_digest(a[:]) != column_digest(a[:9])
+    True
+    >>> m = np.arange(20).reshape(10, 2)
+    >>> column_digest(m[:, 0]) == column_digest(np.arange(0, 20, 2))
+    True
+    >>> digest = column_digest(a)
+    >>> a[0] = 1  # The memo is disabled by default, so a mutated array gets a new digest.
+    >>> column_digest(a) != digest
+    True
+    >>> digest = column_digest(a)
+    >>> setup(merkle_chunk_rows=20)  # A single chunk either way, but the ids depend on the setting.
+    >>> column_digest(a) != digest
+    True
+    >>> setup(merkle_chunk_rows=1_000_000)
+    """
+    import numpy as np
+
+    rows = GLOBAL["merkle_chunk_rows"]
+    if memo := GLOBAL["value_memo"]:
+        base = a
+        while isinstance(base.base, np.ndarray):
+            base = base.base
+        key = (a.__array_interface__["data"][0], a.shape, a.strides, a.dtype.str, rows)
+        with merkle_lock:
+            if (entry := merkle_memo.get(key)) is not None and entry[0]() is base:
+                return entry[1]
+
+    h = blake3(f"{a.dtype.str}{a.shape}/{rows}".encode())
+    for i in range(0, len(a), rows):
+        chunk = np.ascontiguousarray(a[i : i + rows])
+        h.update(blake3(chunk.view("u1").data).digest())
+    digest = h.digest()
+    if not memo:
+        return digest
+
+    def discard(ref):
+        with merkle_lock:
+            if key in merkle_memo and merkle_memo[key][0] is ref:
+                del merkle_memo[key]
+
+    try:
+        ref = weakref.ref(base, discard)
+    except TypeError:  # pragma: no cover
+        return digest
+    with merkle_lock:
+        merkle_memo[key] = ref, digest
+    return digest
+
+
+hashers = {}  # type: (name, hasher, version)
+pending = {}  # "module.name": (hasher, version), for types of modules not imported yet
+register_hasher(type(None), lambda v: [])
+register_hasher(bool, lambda v: [b"1" if v else b"0"])
+register_hasher(int, lambda v: [str(v).encode()])
+register_hasher(float, lambda v: [v.hex().encode()])
+register_hasher(str, lambda v: [v.encode("utf8", "surrogatepass")])
+register_hasher(bytes, lambda v: [v])
+register_hasher("numpy.ndarray", ndarray2parts, version=3)
+register_hasher("pandas.Series", series2parts, version=3)
+register_hasher("pandas.DataFrame", dataframe2parts, version=4)
+merkle_memo = {}
+merkle_lock = Lock()
+
+
+def hosh_fromdigest(digest, etype, version):
+    """
+    Hosh from a blake3 digest, as it would be done by garoupa for the hashed bytes
+
+    It mirrors 'garoupa.misc.core.cells_id_fromblob()', which only accepts the bytes to be hashed;
+    that is why garoupa is pinned in pyproject.toml. The checks below compare both for each element type.
+
+    >>> from garoupa import ø40
+    >>> from garoupa.misc.core import cells_id_fromblob
+    >>> hosh_fromdigest(blake3(b"sdff").digest(length=ø40.bytes), "hybrid", ø40.version) == ø40.h * b"sdff"
+    True
+    >>> all(
+    ...     hosh_fromdigest(blake3(b"sdff").digest(length=ø40.bytes), etype, ø40.version).cells
+    ...     == cells_id_fromblob(b"sdff", etype, ø40.bytes, ø40.version[0])[0]
+    ...     for etype in ["unordered", "hybrid", "ordered"]
+    ... )
+    True
+    """
+    p = version[0]
+    n = int.from_bytes(digest, byteorder="little") >> 1
+    if etype == "unordered":
+        n %= p
+    elif etype == "hybrid":
+        n = (p + n) % p ** 4
+    else:
+        n = (p ** 4 + n) % p ** 6
+    return Hosh(int2cells(n, p), version=version)
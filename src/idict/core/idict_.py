@@ -30,6 +30,8 @@ from typing import TypeVar, Union, Callable
 from garoupa import ø40
 
 import idict.core.frozenidentifieddict as fro
+from idict.core.interning import interned
+from idict.core.overlay import Overlay
 from idict.parameter.ifunctionspace import iFunctionSpace
 from idict.parameter.ilet import iLet
 from idict.persistence.cache import Cache
@@ -390,6 +392,7 @@ class Idict(AbstractMutableLazyDict):
             self.frozen = _dictionary
         else:
             self.frozen = FrozenIdentifiedDict(_dictionary, _id, _ids, rnd, identity, _cloned, **kwargs)
+        self.frozen = interned(self.frozen)
 
     @property
     def id(self):
@@ -430,7 +433,7 @@ class Idict(AbstractMutableLazyDict):
     def __delitem__(self, key):
         if not isinstance(key, str):
             raise WrongKeyType(f"Key must be string, not {type(key)}.", key)
-        data, blobs, hashes, hoshes = self.data.copy(), self.blobs.copy(), self.hashes.copy(), self.hoshes.copy()
+        data, blobs, hashes, hoshes = self.data.copy(), Overlay(self.blobs), Overlay(self.hashes), Overlay(self.hoshes)
         del data[key]
         for coll in [blobs, hashes, hoshes]:
             if key in coll:
@@ -438,6 +441,28 @@ class Idict(AbstractMutableLazyDict):
         hosh = reduce(operator.mul, [self.identity] + [v for k, v in hoshes.items() if not k.startswith("_")])
         self.frozen = self.frozen.clone(data, _cloned=dict(blobs=blobs, hashes=hashes, hoshes=hoshes, hosh=hosh))
 
+    def evaluate(self, workers=None, backend="thread", lean=False, keep=None):
+        """
+        >>> from time import sleep, time
+        >>> d = Idict(x=3)
+        >>> d["y"] = lambda x: sleep(0.3) or x + 1
+        >>> d["z"] = lambda x: sleep(0.3) or x + 2
+        >>> t = time()
+        >>> d.evaluate(workers=2)
+        >>> time() - t < 0.55, d.y, d.z
+        (True, 4, 5)
+        >>> from idict.function.data import binarize
+        >>> from pandas import DataFrame
+        >>> d = Idict(X=DataFrame({"a": [0, 1], "b": ["x", "y"]}), nomcols=[1]) >> binarize >> [cache := {}]
+        >>> d.evaluate(workers=2, backend="process")
+        >>> Idict(d.id, cache).Xbin.equals(d.Xbin)
+        True
+        """
+        self.frozen.evaluate(workers, backend, lean, keep)
+
+    async def aevaluate(self, workers=None, backend="thread", lean=False, keep=None, executor=None):
+        await self.frozen.aevaluate(workers, backend, lean, keep, executor)
+
     def clone(self, data=None, rnd=None, _cloned=None):
         return self.frozen.clone(data, rnd, _cloned).asmutable
 
@@ -465,7 +490,7 @@ class Idict(AbstractMutableLazyDict):
         if isinstance(left, list) or callable(left):
             return iFunctionSpace(left, aop, self)
         clone = self.__class__(identity=self.identity)
-        clone.frozen = left >> self.frozen
+        clone.frozen = interned(left >> self.frozen)
         return clone
 
     def __rshift__(self, other: Union[list, dict, AbstractLazyDict, Callable, iLet, iFunctionSpace, Random]):
@@ -475,19 +500,19 @@ class Idict(AbstractMutableLazyDict):
         {'y': '...', 'x': 'U8_a7205a343c568c5fe7c4619104ae78bd43279'}
         """
         clone = self.__class__(identity=self.identity)
-        clone.frozen = self.frozen >> other
+        clone.frozen = interned(self.frozen >> other)
         return clone
 
     def __rxor__(self, left: Union[Random, dict, Callable, iFunctionSpace]):
         if isinstance(left, list) or callable(left):
             return iFunctionSpace(left, cop, self)
         clone = self.__class__(identity=self.identity)
-        clone.frozen = left ^ self.frozen
+        clone.frozen = interned(left ^ self.frozen)
         return clone
 
     def __xor__(self, other: Union[dict, AbstractLazyDict, Callable, iLet, iFunctionSpace, Random]):
         clone = self.__class__(identity=self.identity)
-        clone.frozen = self.frozen ^ other
+        clone.frozen = interned(self.frozen ^ other)
         return clone
 
     @property
@@ -500,6 +525,39 @@ class Idict(AbstractMutableLazyDict):
 
         return FrozenIdentifiedDict.fromid(id, cache, identity).asmutable
 
+    @staticmethod
+    async def afromid(id, cache, identity=ø40):
+        """
+        >>> import asyncio
+        >>> cache = {}
+        >>> ds = [Idict(x=i) >> (lambda x: {"y": x**2}) >> [cache] for i in range(3)]
+        >>> for d in ds:
+        ...     d.evaluate()
+        >>> async def request(id):
+        ...     d = await Idict.afromid(id, cache)
+        ...     await d.aevaluate()
+        ...     return d.y
+        >>> async def main():
+        ...     return await asyncio.gather(*(request(d.id) for d in ds))
+        >>> asyncio.run(main())
+        [0, 1, 4]
+        """
+        from idict.core.frozenidentifieddict import FrozenIdentifiedDict
+
+        return (await FrozenIdentifiedDict.afromid(id, cache, identity)).asmutable
+
+    @staticmethod
+    def frombatch(records, identity=ø40):
+        """
+        >>> from idict import idict
+        >>> ds = idict.frombatch([{"x": 1, "y": 2}, {"x": 1, "y": 3}])
+        >>> ds[1] == idict(x=1, y=3)
+        True
+        """
+        from idict.core.frozenidentifieddict import FrozenIdentifiedDict
+
+        return [d.asmutable for d in FrozenIdentifiedDict.frombatch(records, identity)]
+
     @staticmethod
     def fromfile(name, output=["df"], output_format="df", include_name=False, identity=ø40):
         from idict.core.frozenidentifieddict import FrozenIdentifiedDict
@@ -530,6 +588,11 @@ class Idict(AbstractMutableLazyDict):
 
         return FrozenIdentifiedDict.fromopenml(name, version, Xout, yout, identity).asmutable
 
+    @property
+    def compact(self):
+        """Memory-lean read-only snapshot, see CompactIdict"""
+        return self.frozen.compact
+
     @property
     def metafields(self):
         """
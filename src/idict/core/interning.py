@@ -0,0 +1,79 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from weakref import WeakValueDictionary
+
+from ldict.lazyval import LazyVal
+
+from idict.config import GLOBAL
+
+table = WeakValueDictionary()
+"""Frozen idicts alive in memory, by id (see setup(interning=True))"""
+
+
+def internkey(id, ids):
+    """Neither metafields nor the order of fields take part in the id, so all ids compose the key"""
+    return id, *ids.items()
+
+
+def lookup(id, ids):
+    """Instance already in memory for the given id and ids, if any"""
+    return table.get(internkey(id, ids)) if GLOBAL["interning"] else None
+
+
+def interned(d):
+    """
+    Shared instance of a frozen idict: the first one created with its id that is still alive in memory
+
+    Idicts with lazy fields are neither shared nor registered, since their evaluation can have side effects,
+    e.g., storing values into a cache. They are registered once evaluated.
+    Idicts carrying a random number generator (e.g., 'd >> Random(0)') are not interned either,
+    since the generator is not part of the id.
+
+    >>> from idict import idict, setup
+    >>> setup(interning=True)
+    >>> a = idict(x=5) >> {"y": 7}
+    >>> b = idict(x=5, y=7)
+    >>> a.frozen is b.frozen, a == b
+    (True, True)
+    >>> c = idict(x=5, y=7, _meta=1)
+    >>> c.frozen is b.frozen
+    False
+    >>> cache = {}
+    >>> d = idict(x=5) >> (lambda x: {"y": x + 2}) >> [cache]
+    >>> interned(d.frozen) is d.frozen  # Lazy 'd' is not registered yet.
+    True
+    >>> d.evaluate()
+    >>> idict(d.id, cache).frozen is d.frozen
+    True
+    >>> from random import Random
+    >>> e = idict(x=5) >> Random(0)
+    >>> e.frozen.rnd is not None, interned(e.frozen) is e.frozen
+    (True, True)
+    >>> setup(interning=False)
+    >>> idict(x=5, y=7).frozen is b.frozen
+    False
+    """
+    if not GLOBAL["interning"] or d._internals is None:  # Idicts pending identification are not interned.
+        return d
+    if d.rnd is not None or any(isinstance(v, LazyVal) for v in d.data.values()):
+        return d
+    return table.setdefault(internkey(d.id, d.ids), d)
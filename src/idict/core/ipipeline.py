@@ -0,0 +1,185 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from operator import rshift as aop
+from types import FunctionType
+
+from garoupa import ø40
+from ldict.core.inspection import extract_input, extract_body, extract_dynamic_input, extract_output
+from ldict.core.inspection import CodeExtractionException
+from ldict.core.rshift import prepare_deps
+from ldict.lazyval import LazyVal
+
+from idict.core.identification import fhosh
+from idict.core.overlay import Overlay
+from idict.core.tracing import instrumented
+from idict.parameter.ilet import iLet
+
+
+class iPipeline:
+    """
+    Function space compiled for repeated application
+
+    Inspection of functions (input, parameters, output fields) and their hoshes are calculated once.
+    Applying the pipeline to an idict only creates the lazy values and the field hoshes of each step,
+    building a single idict at the end, instead of one intermediate idict per function.
+    Steps that cannot be planned in advance (caches, random sampling, dicts, noop or dynamic fields, '...' metafields,
+    '^' operator) are applied as usual.
+
+    >>> from idict import idict
+    >>> from idict.parameter.ifunctionspace import iFunctionSpace
+    >>> fs = iFunctionSpace.fromfunctions(lambda x: {"y": x + 1}, lambda x, y: {"z": x * y, "w": x - y})
+    >>> pipeline = fs.compile()
+    >>> pipeline
+    «λ × λ»
+    >>> d = pipeline(idict(x=3))
+    >>> d.show(colored=False)
+    {
+        "z": "→(x y→(x))",
+        "w": "→(x y→(x))",
+        "y": "→(x)",
+        "x": 3,
+        "_id": "U267TWJgfSR6Gn1ii8rzOEcahcnt2W8nKChWsKWE",
+        "_ids": {
+            "z": "O-iQMlykT8gwAxX3bccQtdUZE-sl36WQQqYtQsVk",
+            "w": "nzSoTPlaVefPeyx0YY9HFW8DecQEJKIWvAKBOUNR",
+            "y": "SPfZLVAhTJoYsCc5t.GbpQi97fAhbcyDp36SRofu",
+            "x": "ME_bd0a8d9d8158cdbb9d7d4c7af1659ca1dabc9 (content: S5_331b7e710abd1443cd82d6b5cdafb9f04d5ab)"
+        }
+    }
+    >>> d == idict(x=3) >> fs, d.ids == (idict(x=3) >> fs).ids
+    (True, True)
+    >>> [e.z for e in pipeline.map([{"x": 1}, {"x": 2}])]
+    [2, 6]
+    >>> e = idict(x=5) >> pipeline
+    >>> e.id == (idict(x=5) >> fs).id
+    True
+    """
+
+    def __init__(self, functionspace, identity=ø40):
+        self.functionspace = functionspace
+        self.identity = identity
+        functions_and_ops = functionspace.functions_and_ops
+        items, ops = functions_and_ops[::2], (aop,) + functions_and_ops[1::2]
+        self.steps = [(op, item, self.plan(item) if op is aop else None) for op, item in zip(ops, items)]
+
+    def plan(self, item):
+        """Precalculate everything needed to apply a function, or return None when it should be applied as usual"""
+        if isinstance(item, iLet):
+            config, f, config_hosh = item.config, item.f, item.bytes
+        elif callable(item) and not isinstance(item, (dict, list)):
+            config, f, config_hosh = {}, item, self.identity
+        else:
+            return None
+        try:
+            input_fields, parameters, optional = extract_input(f)
+        except Exception:  # pragma: no cover
+            return None
+        if "_" in input_fields:
+            return None
+        parameters.update(config)
+        if any(isinstance(v, list) and k not in optional for k, v in parameters.items()):
+            return None
+        metadata = f.metadata if hasattr(f, "metadata") else {}
+        if isinstance(f, FunctionType):
+            try:
+                body = extract_body(f)
+            except CodeExtractionException:
+                return None
+            if extract_dynamic_input("".join(body)):
+                return None
+        elif "input" in metadata and "output" in metadata:
+            body = None
+        else:
+            return None
+        if "dynamic" in metadata.get("input", {}) or "dynamic" in metadata.get("output", {}):
+            return None
+        try:
+            explicit, meta, meta_ellipsed = extract_output(f, body, parameters, True, [])
+        except Exception:
+            return None
+        if meta_ellipsed:
+            return None
+        f_hosh = metadata["id"] if "id" in metadata else fhosh(f, self.identity.version)
+        f_hosh_full = self.identity * config_hosh * f_hosh  # d' = d * ħ(config) * f
+        return f, input_fields, parameters, optional, explicit + meta, f_hosh_full
+
+    def __call__(self, d):
+        from idict.core.frozenidentifieddict import FrozenIdentifiedDict
+        from idict.core.idict_ import Idict
+        from idict.core.rshift import applied
+
+        if isinstance(d, Idict):
+            clone = Idict(identity=d.identity)
+            clone.frozen = self(d.frozen)
+            return clone
+        if not isinstance(d, FrozenIdentifiedDict):
+            return self(Idict(d, identity=self.identity))
+        if d.identity != self.identity:  # pragma: no cover
+            return d >> self.functionspace
+
+        state = None
+        for op, item, plan in self.steps:
+            if plan is None:
+                if state is not None:
+                    d = FrozenIdentifiedDict(state[0], rnd=d.rnd, identity=self.identity, _cloned=state[1])
+                    state = None
+                d = op(d, item)
+                continue
+            if state is None:
+                data = {k: v for k, v in d.data.items() if k not in ["_id", "_ids"]}
+                state = data, dict(blobs=d.blobs, hashes=d.hashes, hoshes=d.hoshes, hosh=d.hosh)
+            data, internals = state
+            f, input_fields, parameters, optional, outputs, f_hosh_full = plan
+            deps = prepare_deps(data, input_fields, parameters, d.rnd, set(), optional)
+            lazies = []
+            newdata = {k: LazyVal(k, f, deps, data, lazies) for k in outputs}
+            lazies.extend(newdata.values())
+            instrumented(lazies)
+            newhoshes, hosh = applied(self.identity, internals["hosh"], internals["hoshes"], outputs, f_hosh_full)
+            blobs, hashes = Overlay(internals["blobs"]), Overlay(internals["hashes"])
+            for k in outputs:
+                if k in blobs:
+                    del blobs[k]
+                if k in hashes:
+                    del hashes[k]
+            for k, v in internals["hoshes"].items():
+                if k not in newdata:
+                    newhoshes[k] = v
+                    newdata[k] = data[k]
+            state = newdata, dict(blobs=blobs, hashes=hashes, hoshes=newhoshes, hosh=hosh)
+        if state is not None:
+            d = FrozenIdentifiedDict(state[0], rnd=d.rnd, identity=self.identity, _cloned=state[1])
+        return d
+
+    def map(self, ds):
+        """Apply the pipeline to each idict (or dict) in the given iterable"""
+        return [self(d) for d in ds]
+
+    def __rrshift__(self, left):
+        from ldict.core.base import AbstractLazyDict
+
+        if isinstance(left, (dict, AbstractLazyDict)):
+            return self(left)
+        return NotImplemented  # pragma: no cover
+
+    def __repr__(self):
+        return repr(self.functionspace)
@@ -0,0 +1,128 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from collections.abc import MutableMapping, ItemsView
+
+DELETED = object()
+
+
+class Overlay(MutableMapping):
+    """
+    Copy-on-write mapping for the internals (blobs, hashes, hoshes) of derived idicts
+
+    An overlay shares the (never modified) base dict of its parent and keeps only its own changes, so deriving an
+    idict costs proportionally to the number of changed fields instead of copying all of them.
+    When changes accumulate too much in comparison to the base, they are merged into a new base dict.
+    Iteration order is the same as that of a dict subjected to the same operations.
+
+    >>> base = {"x": 1, "y": 2, "z": 3}
+    >>> a = Overlay(base)
+    >>> a["y"] = 20
+    >>> del a["x"]
+    >>> a["w"] = 4
+    >>> a["x"] = 10
+    >>> b = Overlay(a)
+    >>> del b["z"]
+    >>> dict(a), dict(b), base
+    ({'y': 20, 'z': 3, 'w': 4, 'x': 10}, {'y': 20, 'w': 4, 'x': 10}, {'x': 1, 'y': 2, 'z': 3})
+    >>> a.base is b.base is base, len(b), "z" in b, b.get("z")
+    (True, 3, False, None)
+    >>> c = Overlay(b)
+    >>> for i in range(20):
+    ...     c[i] = i
+    >>> Overlay(c).base is base, Overlay(c) == c
+    (False, True)
+    """
+
+    __slots__ = ("base", "changes", "added", "ndeleted")
+
+    def __init__(self, parent=None):
+        if isinstance(parent, Overlay):
+            self.base, self.changes, self.added = parent.base, parent.changes.copy(), parent.added.copy()
+            self.ndeleted = parent.ndeleted
+            if len(self.changes) + len(self.added) > max(16, len(self.base) // 4):
+                self.base, self.changes, self.added, self.ndeleted = dict(self.items()), {}, {}, 0
+        else:
+            self.base, self.changes, self.added, self.ndeleted = {} if parent is None else parent, {}, {}, 0
+
+    def __getitem__(self, key):
+        if key in self.added:
+            return self.added[key]
+        if key in self.changes:
+            if (value := self.changes[key]) is DELETED:
+                raise KeyError(key)
+            return value
+        return self.base[key]
+
+    def __contains__(self, key):
+        if key in self.added:
+            return True
+        if key in self.changes:
+            return self.changes[key] is not DELETED
+        return key in self.base
+
+    def __setitem__(self, key, value):
+        if key in self.added or key not in self.base or self.changes.get(key) is DELETED:
+            self.added[key] = value
+        else:
+            self.changes[key] = value
+
+    def __delitem__(self, key):
+        if key in self.added:
+            del self.added[key]
+        elif key in self.base and self.changes.get(key) is not DELETED:
+            self.changes[key] = DELETED
+            self.ndeleted += 1
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        if self.ndeleted:
+            for k in self.base:
+                if self.changes.get(k) is not DELETED:
+                    yield k
+        else:
+            yield from self.base
+        yield from self.added
+
+    def items(self):
+        return OverlayItems(self)
+
+    def __len__(self):
+        return len(self.base) - self.ndeleted + len(self.added)
+
+    def copy(self):
+        return Overlay(self)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class OverlayItems(ItemsView):
+    def __iter__(self):
+        overlay = self._mapping
+        if overlay.changes:
+            for k, v in overlay.base.items():
+                if (v := overlay.changes.get(k, v)) is not DELETED:
+                    yield k, v
+        else:
+            yield from overlay.base.items()
+        yield from overlay.added.items()
@@ -28,8 +28,11 @@ from garoupa import Hosh, removal_elem
 
 from idict.core.frozenidentifieddict import FrozenIdentifiedDict
 from idict.core.identification import fhosh, blobs_hashes_hoshes
+from idict.core.overlay import Overlay
+from idict.core.tracing import instrumented
 from idict.parameter.ilet import iLet
-from ldict.core.base import AbstractLazyDict
+from ldict.core.base import AbstractLazyDict, AbstractMutableLazyDict
+from ldict.lazyval import LazyVal
 
 
 def application(self: FrozenIdentifiedDict, other, f, config_hosh, output=None):
@@ -61,53 +64,69 @@ def application(self: FrozenIdentifiedDict, other, f, config_hosh, output=None):
     else:
         frozen = self.frozen >> other
         outputs = frozen.returned
+    instrumented(frozen.data[k] for k in outputs if isinstance(frozen.data[k], LazyVal))
     if "_history" in outputs and ... in frozen.data["_history"]:
         frozen.data["_history"][f.hosh.id] = frozen.data["_history"].pop(...)
-    uf = self.hosh * f_hosh_full
-    ufu_1 = lambda: solve(self.hoshes, outputs, uf)
+    outhoshes, uf = applied(self.identity, self.hosh, self.hoshes, outputs, f_hosh_full)
 
     # Reorder items.
-    newdata, newhoshes, newblobs, newhashes, = (
-        {},
-        {},
-        self.blobs.copy(),
-        self.hashes.copy(),
-    )
-    noutputs = len(outputs)
-    if noutputs == 1:
-        k = outputs[0]
+    # Only blobs and hashes are copy-on-write (see Overlay), as their order does not matter. Data, hoshes and ids are
+    # rebuilt in full, since output fields come first, e.g., in '_ids' as shown and stored; ldict's '>>' already
+    # copies the data anyway.
+    newdata, newhoshes, newblobs, newhashes = {}, outhoshes, Overlay(self.blobs), Overlay(self.hashes)
+    for k in outputs:
         newdata[k] = frozen.data[k]
-        newhoshes[k] = ufu_1() if k in self.ids else uf * ~self.hosh
-    else:
-        ufu_1 = ufu_1()
-        acc = self.identity
-        c = 0
-        last_nonmeta = None
-        for k in outputs:
-            if not k.startswith("_"):
-                last_nonmeta = k
-        for i, k in enumerate(outputs):
-            newdata[k] = frozen.data[k]
-            field_hosh = Hosh(f"{ufu_1.id}-{c}".encode())
-            c += 1
-            if k == last_nonmeta:
-                field_hosh = ~acc * ufu_1
-            elif not k.startswith("_"):
-                acc *= field_hosh
-            newhoshes[k] = field_hosh
-            if k in newblobs:
-                del newblobs[k]
-            if k in newhashes:
-                del newhashes[k]
-    for k in self.ids:
+        if k in newblobs:
+            del newblobs[k]
+        if k in newhashes:
+            del newhashes[k]
+    newids = {k: v.id for k, v in outhoshes.items()}
+    for k, id in self.ids.items():
         if k not in newdata:
             newhoshes[k] = self.hoshes[k]
+            newids[k] = id
             newdata[k] = frozen.data[k]
 
-    cloned_internals = dict(blobs=newblobs, hashes=newhashes, hoshes=newhoshes, hosh=uf)
+    cloned_internals = dict(blobs=newblobs, hashes=newhashes, hoshes=newhoshes, hosh=uf, ids=newids)
     return self.clone(newdata, _cloned=cloned_internals)
 
 
+def applied(identity, hosh, hoshes, outputs, f_hosh_full):
+    """
+    Hoshes of the output fields, and the resulting hosh, of applying a function to an idict
+
+    The resulting hosh is simply 'hosh * f_hosh_full'; the output hoshes are solved so that their product with
+    the remaining fields matches it.
+
+    >>> from garoupa import ø40
+    >>> from idict.core.frozenidentifieddict import FrozenIdentifiedDict as idict
+    >>> d = idict(x=3, y=5)
+    >>> f_hosh = ø40 * b"f"
+    >>> outhoshes, uf = applied(ø40, d.hosh, d.hoshes, ["z", "w"], f_hosh)
+    >>> uf == d.hosh * f_hosh, outhoshes["z"] * outhoshes["w"] * d.hoshes["x"] * d.hoshes["y"] == uf
+    (True, True)
+    """
+    uf = hosh * f_hosh_full
+    if len(outputs) == 1:
+        k = outputs[0]
+        return {k: solve(hoshes, outputs, uf) if k in hoshes else uf * ~hosh}, uf
+    ufu_1 = solve(hoshes, outputs, uf)
+    acc = identity
+    last_nonmeta = None
+    for k in outputs:
+        if not k.startswith("_"):
+            last_nonmeta = k
+    outhoshes = {}
+    for c, k in enumerate(outputs):
+        field_hosh = Hosh(f"{ufu_1.id}-{c}".encode())
+        if k == last_nonmeta:
+            field_hosh = ~acc * ufu_1
+        elif not k.startswith("_"):
+            acc *= field_hosh
+        outhoshes[k] = field_hosh
+    return outhoshes, uf
+
+
 def ihandle_dict(self, dictlike: Union[AbstractLazyDict, dict]):
     """
     >>> from idict.core.frozenidentifieddict import FrozenIdentifiedDict as idict
@@ -191,40 +210,98 @@ def ihandle_dict(self, dictlike: Union[AbstractLazyDict, dict]):
         "_id": "kSXVu8FBqNHPSdEaa1dXgyOXI5yWX7zUjhvy-1n0",
         "_ids": {
             "y": "WK_6ba95267cec724067d58b3186ecbcaa4253ad (content: 3m_131910d18a892d1b64285250092a4967c8065)",
-            "x": "SSBT4S9CxTb9pCd1US4DCDlXIEwWX7zUjhvy-1n0 (content: cgNWCdJP7XKZASgpBlTRcNAJMPoMv3y0LQcFOoIK)"
+            "x": "SSBT4S9CxTb9pCd1US4DCDlXIEwWX7zUjhvy-1n0"
         }
     }
     """
     from idict.core.frozenidentifieddict import FrozenIdentifiedDict
 
-    clone = self.clone(rnd=dictlike.rnd) if isinstance(dictlike, AbstractLazyDict) and dictlike.rnd else self.clone()
+    clone = self.clone(rnd=dictlike.rnd) if isinstance(dictlike, AbstractLazyDict) and dictlike.rnd else self
+    values, deletions = {}, []
     for k, v in dictlike.items():
+        if k in ["_id", "_ids"]:
+            continue
         if v is None:
-            clone = delete(clone, k)
-        elif k not in ["_id", "_ids"]:
-            if isinstance(v, iLet):
-                clone = application(clone, v, v.f, v.bytes, k)
-            elif callable(v):
-                clone = application(clone, v, v, self.identity, k)
-            else:
-                internals = blobs_hashes_hoshes({k: v}, self.identity, {}, self.identity.version)
-                if k in internals["blobs"]:
-                    clone.blobs[k] = internals["blobs"][k]
-                if k in internals["hashes"]:
-                    clone.hashes[k] = internals["hashes"][k]
-                clone.hoshes[k] = internals["hoshes"][k]
-                hosh = reduce(
-                    operator.mul, [self.identity] + [v for k, v in clone.hoshes.items() if not k.startswith("_")]
-                )
-                internals = dict(blobs=clone.blobs, hashes=clone.hashes, hoshes=clone.hoshes, hosh=hosh)
-                del clone.data["_id"]
-                del clone.data["_ids"]
-                clone = FrozenIdentifiedDict(
-                    clone.data, rnd=clone.rnd, identity=self.identity, _cloned=internals, **{k: v}
-                )
+            # Consecutive deletions are done at once.
+            if values:
+                clone, values = insert(clone, values), {}
+            deletions.append(k)
+            continue
+        if deletions:
+            clone, deletions = delete_many(clone, deletions), []
+        if not isinstance(v, iLet) and not callable(v):
+            # Consecutive plain values are inserted at once.
+            values[k] = v
+            continue
+        if values:
+            clone, values = insert(clone, values), {}
+        if isinstance(v, iLet):
+            clone = application(clone, v, v.f, v.bytes, k)
+        else:
+            clone = application(clone, v, v, self.identity, k)
+    if values:
+        clone = insert(clone, values)
+    if deletions:
+        clone = delete_many(clone, deletions)
     return clone
 
 
+def insert(self, values):
+    """
+    Add or replace many plain values, building a single new object
+
+    New fields are multiplied into the current hosh; only replacing a field requires recalculating the product.
+
+    >>> from idict.core.frozenidentifieddict import FrozenIdentifiedDict as idict
+    >>> a = idict(x=1, _m=0)
+    >>> b = insert(a, {"y": 2, "z": 3, "_n": 4})
+    >>> b == idict(x=1, _m=0, y=2, z=3, _n=4), a == idict(x=1, _m=0)
+    (True, True)
+    >>> insert(b, {"y": 5, "w": 6}) == idict(x=1, _m=0, y=5, z=3, _n=4, w=6)
+    True
+
+    Ids given by the caller are discarded for replaced fields, also when identification is postponed.
+
+    >>> from idict import setup
+    >>> setup(lazy_identity=True)
+    >>> lazy = insert(idict(x=1, _ids={"x": "y" * 40}), {"x": 2})
+    >>> setup(lazy_identity=False)
+    >>> lazy.ids["x"] == insert(idict(x=1, _ids={"x": "y" * 40}), {"x": 2}).ids["x"] == idict(x=2).ids["x"]
+    True
+    """
+    from idict.core.frozenidentifieddict import FrozenIdentifiedDict
+
+    values = {k: v.frozen if isinstance(v, AbstractMutableLazyDict) else v for k, v in values.items()}
+    data = self.data.copy()
+    del data["_id"]
+    del data["_ids"]
+    data.update(values)
+    if self._internals is None:  # Lazy identity: the result can also postpone hashing.
+        ids = {k: v for k, v in self._pending_ids.items() if k not in values}
+        return FrozenIdentifiedDict(data, _ids=ids, rnd=self.rnd, identity=self.identity)
+
+    internals = blobs_hashes_hoshes(values, self.identity, {}, self.identity.version)
+    blobs, hashes, hoshes, ids = Overlay(self.blobs), Overlay(self.hashes), Overlay(self.hoshes), self.ids.copy()
+    replaced = any(k in hoshes and not k.startswith("_") for k in values)
+    for k in values:
+        if k in internals["blobs"]:
+            blobs[k] = internals["blobs"][k]
+        elif k in blobs:
+            del blobs[k]
+        if k in internals["hashes"]:
+            hashes[k] = internals["hashes"][k]
+        elif k in hashes:  # pragma: no cover
+            del hashes[k]
+        hoshes[k] = internals["hoshes"][k]
+        ids[k] = hoshes[k].id
+    if replaced:
+        hosh = reduce(operator.mul, [self.identity] + [v for k, v in hoshes.items() if not k.startswith("_")])
+    else:
+        hosh = reduce(operator.mul, [self.hosh] + [v for k, v in internals["hoshes"].items() if not k.startswith("_")])
+    internals = dict(blobs=blobs, hashes=hashes, hoshes=hoshes, hosh=hosh, ids=ids)
+    return FrozenIdentifiedDict(data, rnd=self.rnd, identity=self.identity, _cloned=internals)
+
+
 def placeholder(key, f_hosh, identity, hoshes: Dict[str, Hosh]):
     it = iter(hoshes.items())
     while (pair := next(it))[0] != key:
@@ -301,14 +378,59 @@ def delete(self, k):
     uf = self.hosh * f_hosh
     newdata = self.data.copy()
     newdata[k] = None
-    newhoshes, newblobs, newhashes, = (
-        self.hoshes.copy(),
-        self.blobs.copy(),
-        self.hashes.copy(),
-    )
+    newhoshes, newblobs, newhashes = Overlay(self.hoshes), Overlay(self.blobs), Overlay(self.hashes)
     newhoshes[k] = placeholder(k, f_hosh, self.identity, self.hoshes)
+    newids = self.ids.copy()
+    newids[k] = newhoshes[k].id
     if k in newblobs:
         del newblobs[k]
     if k in newhashes:
         del newhashes[k]
-    return self.clone(newdata, _cloned=dict(blobs=newblobs, hashes=newhashes, hoshes=newhoshes, hosh=uf))
+    return self.clone(newdata, _cloned=dict(blobs=newblobs, hashes=newhashes, hoshes=newhoshes, hosh=uf, ids=newids))
+
+
+def delete_many(self, keys):
+    """
+    Replace the content of many fields by None, building a single new object
+
+    The result is the same as deleting one field after another.
+    Deleting a field q right-multiplies by its removal element the product of the hoshes after any field p before q.
+    So, products of the original hoshes after each field are calculated in a single backward pass,
+    and only the removal elements of the previously deleted fields further to the right need to be added.
+
+    >>> from idict.core.frozenidentifieddict import FrozenIdentifiedDict as idict
+    >>> d = idict(a=1, b=2, c=3, _m=4, e=5)
+    >>> e = delete_many(d, ["c", "a", "e"])
+    >>> e == delete(delete(delete(d, "c"), "a"), "e"), e.ids == delete(delete(delete(d, "c"), "a"), "e").ids
+    (True, True)
+    >>> e.a, e.b, e.c, e.e
+    (None, 2, None, None)
+    """
+    hoshes = self.hoshes
+    right, acc = {}, self.identity
+    for k, v in reversed(list(hoshes.items())):
+        right[k] = acc
+        acc = v * acc
+    position = {k: i for i, k in enumerate(hoshes)}
+
+    uf = self.hosh
+    newdata = self.data.copy()
+    newhoshes, newblobs, newhashes = Overlay(hoshes), Overlay(self.blobs), Overlay(self.hashes)
+    newids = self.ids.copy()
+    deleted = []
+    for k in keys:
+        f_hosh = removal_elem(k)
+        rightk = right[k]
+        for p, f in deleted:
+            if p > position[k]:
+                rightk *= f
+        newhoshes[k] = newhoshes[k] * rightk * f_hosh * ~rightk
+        newids[k] = newhoshes[k].id
+        deleted.append((position[k], f_hosh))
+        uf *= f_hosh
+        newdata[k] = None
+        if k in newblobs:
+            del newblobs[k]
+        if k in newhashes:
+            del newhashes[k]
+    return self.clone(newdata, _cloned=dict(blobs=newblobs, hashes=newhashes, hoshes=newhoshes, hosh=uf, ids=newids))
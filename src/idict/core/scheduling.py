@@ -0,0 +1,255 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+from contextvars import ContextVar, copy_context
+
+from ldict.lazyval import LazyVal
+
+from idict.core.tracing import Timed, traced
+from idict.data.compression import pack, unpack, memoize
+
+evaluation_workers = ContextVar("evaluation_workers", default=1)
+"""Number of workers of the ongoing evaluation, also used by cached() jobs to produce their fields"""
+
+evaluation_lean = ContextVar("evaluation_lean", default=False)
+"""Whether the ongoing evaluation releases values as soon as they are no longer needed, see lean_evaluation()"""
+
+evaluation_processes = ContextVar("evaluation_processes", default=None)
+"""Pool of processes of the ongoing evaluation, when it was requested with backend="process" """
+
+
+def local(f):
+    """Mark a function that should never be shipped to another process, e.g., because it accesses a cache"""
+    f.local = True
+    return f
+
+
+def groupkey(lazy):
+    """Fields returned by the same function call form a single job"""
+    return id(lazy.lazies) if lazy.lazies is not None else id(lazy)
+
+
+def dependency_graph(lazies):
+    """
+    Jobs needed to evaluate the given lazy values and, for each job, the jobs it depends on
+
+    >>> from idict import idict
+    >>> d = idict(x=3) >> (lambda x: {"a": x + 1, "b": x + 2}) >> (lambda a: {"c": a * 2}) >> (lambda x: {"e": x})
+    >>> jobs, deps = dependency_graph([d.data[k] for k in "abce"])
+    >>> len(jobs), sorted(len(v) for v in deps.values())
+    (3, [0, 0, 1])
+    """
+    jobs, deps = {}, {}
+    stack = list(lazies)
+    while stack:
+        lazy = stack.pop()
+        if (key := groupkey(lazy)) in jobs or lazy.result is not None:
+            continue
+        jobs[key], deps[key] = lazy, set()
+        for member in lazy.lazies or [lazy]:
+            for dep in member.deps.values():
+                if isinstance(dep, LazyVal) and dep.result is None:
+                    deps[key].add(groupkey(dep))
+                    stack.append(dep)
+    return jobs, deps
+
+
+def schedule(lazies, workers, backend="thread"):
+    """
+    Evaluate lazy values using a pool of threads, starting each job as soon as its dependencies are ready
+
+    Given backend="process", the functions are called by a pool of processes instead,
+    which is useful for CPU-bound functions. See perform().
+
+    >>> from time import sleep, time
+    >>> from idict import idict
+    >>> d = idict(x=3)
+    >>> for i in range(4):
+    ...     d[f"y{i}"] = lambda x: sleep(0.2) or x
+    >>> d >>= lambda y0, y1, y2, y3: {"z": y0 + y1 + y2 + y3}
+    >>> t = time()
+    >>> schedule([d.data["z"]], workers=4)
+    >>> time() - t < 0.6, d.z
+    (True, 12)
+    """
+    jobs, deps = dependency_graph(lazies)
+    dependents = defaultdict(set)
+    for key, keys in deps.items():
+        for dep in keys:
+            dependents[dep].add(key)
+    token = evaluation_workers.set(workers)
+    processes = None
+    if backend == "process" and evaluation_processes.get() is None:
+        processes = ProcessPoolExecutor(max_workers=workers)
+        processes_token = evaluation_processes.set(processes)
+    elif backend not in ["thread", "process"]:  # pragma: no cover
+        raise Exception(f"Unknown backend: {backend}. Options: 'thread', 'process'.")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            ready, running = [key for key, keys in deps.items() if not keys], {}
+            while ready or running:
+                for key in ready:
+                    running[pool.submit(copy_context().run, perform, jobs[key])] = key
+                ready = []
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    if (exception := future.exception()) is not None:
+                        for other in running:
+                            other.cancel()
+                        raise exception
+                    for dependent in dependents[key]:
+                        deps[dependent].discard(key)
+                        if not deps[dependent]:
+                            ready.append(dependent)
+    finally:
+        if processes is not None:
+            evaluation_processes.reset(processes_token)
+            processes.shutdown()
+        evaluation_workers.reset(token)
+
+
+def lean_evaluation(lazies, keep, done=None):
+    """
+    Evaluate lazy values one job at a time, releasing results as soon as all their consumers are evaluated
+
+    Functions are called directly on the results of their dependencies, so neither the dependencies of lazy values
+    nor the data of the idicts they come from are filled with evaluated values.
+    Released values are reset to lazy (i.e., recalculated or loaded from cache if accessed again).
+    Values in 'keep' are never released. 'done' is called with each lazy value when it is evaluated.
+
+    >>> from idict import idict
+    >>> d = idict(x=3) >> (lambda x: {"y": x + 1}) >> (lambda y: {"z": y * 2}) >> (lambda z: {"w": z - 1})
+    >>> lean_evaluation([d.data["w"]], keep=[d.data["w"]], done=lambda lazy: print(lazy.field, lazy.result))
+    y 4
+    z 8
+    w 7
+    >>> d.data["y"].result, d.data["z"].result, d.data["w"].result
+    (None, None, 7)
+    >>> d.z
+    8
+    """
+    jobs, deps = dependency_graph(lazies)
+    dependents = defaultdict(set)
+    for key, keys in deps.items():
+        for dep in keys:
+            dependents[dep].add(key)
+    kept = {groupkey(lazy) for lazy in keep}
+    pending_consumers = {key: len(dependents[key]) for key in jobs}
+    missing, ready = {key: set(keys) for key, keys in deps.items()}, [key for key, keys in deps.items() if not keys]
+
+    def release(key):
+        if key not in kept:
+            for member in jobs[key].lazies or [jobs[key]]:
+                member.result = None
+
+    while ready:
+        key = ready.pop()
+        lazy = jobs[key]
+        if getattr(lazy.f, "local", False):  # E.g., cached() jobs, which fetch their inputs by themselves.
+            lazy.result = lazy.f()
+        else:
+            ret = lazy.f(**{k: v.result if isinstance(v, LazyVal) else v for k, v in lazy.deps.items()})
+            if lazy.lazies is None:
+                lazy.result = ret
+            else:
+                for member in lazy.lazies:
+                    member.result = ret[member.field]
+        if done is not None:
+            for member in lazy.lazies or [lazy]:
+                done(member)
+        for dep in deps[key]:
+            pending_consumers[dep] -= 1
+            if not pending_consumers[dep]:
+                release(dep)
+        if not pending_consumers[key]:
+            release(key)
+        for dependent in dependents[key]:
+            missing[dependent].discard(key)
+            if not missing[dependent]:
+                ready.append(dependent)
+
+
+def perform(lazy):
+    """
+    Evaluate a lazy value (and its siblings) in the current thread or, if there is an ongoing pool, in another process
+
+    The function and its (already evaluated) input values are shipped as pack() blobs, which are reused from the
+    memo when the values were already hashed or packed, e.g., when the idict was created. The output values are
+    shipped back as blobs, which are kept in the attribute 'blob' of each lazy value, so storing them into a cache
+    (see 'cached()') does not serialize them again.
+
+    >>> from idict import idict
+    >>> from idict.function.data import binarize
+    >>> from pandas import DataFrame
+    >>> d = idict(X=DataFrame({"a": [0, 1], "b": ["x", "y"]}), nomcols=[1]) >> binarize
+    >>> with ProcessPoolExecutor(1) as processes:
+    ...     token = evaluation_processes.set(processes)
+    ...     _ = perform(lazy := d.data["Xbin"])
+    ...     evaluation_processes.reset(token)
+    >>> d.Xbin
+       a  b_x  b_y
+    0  0    1    0
+    1  1    0    1
+    >>> lazy.blob[:5]
+    b'pckl_'
+    """
+    if (processes := evaluation_processes.get()) is None or getattr(lazy.f, "local", False):
+        return lazy()
+    for k, v in lazy.deps.items():
+        if isinstance(v, LazyVal):
+            lazy.deps[k] = v()
+            if k in lazy.data:
+                lazy.data[k] = lazy.deps[k]
+    fields = None if lazy.lazies is None else [member.field for member in lazy.lazies]
+    inputs = {k: pack(v, ensure_determinism=False) for k, v in lazy.deps.items()}
+    if isinstance(f := lazy.f, Timed):  # The call is traced here, in the parent process.
+        f, context = f.f, traced("evaluation", f.name, f.field)
+    else:
+        context = nullcontext()
+    with context:
+        blobs = processes.submit(call, pack(f, ensure_determinism=False), inputs, fields).result()
+    if fields is None:
+        lazy.result, lazy.blob = received(blobs)
+    else:
+        for member in lazy.lazies:
+            member.result, member.blob = received(blobs[member.field])
+    return lazy.result
+
+
+def call(fblob, inputs, fields):
+    """Function call inside a worker process, taking and returning blobs"""
+    ret = unpack(fblob)(**{k: unpack(blob) for k, blob in inputs.items()})
+    if fields is None:
+        return pack(ret, ensure_determinism=False)
+    return {k: pack(ret[k], ensure_determinism=False) for k in fields}
+
+
+def received(blob):
+    """Value shipped back from a worker process and its blob, if reusable, also kept in the memo (see 'value_memo')"""
+    value = unpack(blob)
+    if not blob.startswith(b"pckl_"):  # Nondeterministic blobs are not reusable.
+        return value, None
+    memoize(value, "lz4", blob)
+    return value, blob
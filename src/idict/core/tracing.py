@@ -0,0 +1,175 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+import json
+import os
+import threading
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from time import perf_counter
+
+from idict.config import GLOBAL
+
+current_field = ContextVar("current_field", default=None)
+"""Field being processed, to which nested events (e.g., packing inside a cache access) are attributed"""
+
+CATEGORIES = ["hashing", "evaluation", "pack", "unpack", "cache"]
+
+
+class Tracer:
+    """
+    Collect timed events of idict internals: hashing, evaluation of functions, pack/unpack and cache accesses
+
+    Enable it with 'setup(tracer=Tracer())'. Events can be exported to the Chrome trace format
+    (chrome://tracing, https://ui.perfetto.dev) or summarized per field.
+
+    >>> from idict import idict, setup
+    >>> setup(tracer=(tracer := Tracer()))
+    >>> d = idict(x=3) >> (lambda x: {"y": x + 2}) >> [cache := {}]
+    >>> d.evaluate()
+    >>> e = idict.fromid(d.id, cache).evaluated
+    >>> setup(tracer=False)
+    >>> events = sorted({(e["cat"], e["name"], e["args"].get("field") or "-") for e in tracer.events})
+    >>> events  # doctest:+NORMALIZE_WHITESPACE
+    [('cache', 'contains_many', '-'), ('cache', 'get', 'y'), ('cache', 'getmany', '-'), ('cache', 'pointers', '-'),
+     ('cache', 'pointers', 'y'), ('cache', 'setmany', '-'), ('evaluation', '<lambda>', 'y'),
+     ('hashing', 'blob_hash', 'x')]
+    >>> print(tracer.summary())  # doctest:+ELLIPSIS
+    field  hashing (ms)  evaluation (ms)  pack (ms)  unpack (ms)  cache (ms)  bytes
+    x      ...
+    y      ...
+    -      ...
+    >>> tracer.chrome()["traceEvents"][0]["ph"]
+    'X'
+    """
+
+    def __init__(self):
+        self.events = []
+        self.origin = perf_counter()
+
+    def record(self, category, name, start, duration, field=None, nbytes=None, **kwargs):
+        args = {"field": field} if field is not None else {}
+        if nbytes is not None:
+            args["bytes"] = nbytes
+        args.update(kwargs)
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1_000_000,
+            "dur": duration * 1_000_000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        self.events.append(event)  # Appending to a list is thread-safe.
+
+    def chrome(self):
+        """Events in the Chrome trace format"""
+        return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def dump(self, filename):
+        """Write events as a Chrome trace JSON file"""
+        with open(filename, "w") as f:
+            json.dump(self.chrome(), f)
+
+    def totals(self):
+        """Total time (ms) per field and category, along with the amount of bytes; unattributed events are under '-'"""
+        totals = defaultdict(lambda: dict({c: 0.0 for c in CATEGORIES}, bytes=0))
+        for event in self.events:
+            row = totals[event["args"].get("field", "-")]
+            row[event["cat"]] += event["dur"] / 1000
+            row["bytes"] += event["args"].get("bytes", 0)
+        return dict(sorted(totals.items(), key=lambda item: item[0] == "-"))
+
+    def summary(self):
+        """Table of totals() as text"""
+        totals = self.totals()
+        header = ["field"] + [f"{c} (ms)" for c in CATEGORIES] + ["bytes"]
+        rows = [[k] + [f"{v[c]:.3f}" for c in CATEGORIES] + [str(v["bytes"])] for k, v in totals.items()]
+        widths = [max(len(r[i]) for r in [header] + rows) for i in range(len(header))]
+        lines = ["  ".join(cell.ljust(w) for cell, w in zip(r, widths)).rstrip() for r in [header] + rows]
+        return "\n".join(lines)
+
+    def clear(self):
+        self.events.clear()
+        self.origin = perf_counter()
+
+
+@contextmanager
+def span(tracer, category, name, field):
+    token = current_field.set(field) if field is not None else None
+    event = {}
+    start = perf_counter()
+    try:
+        yield event
+    finally:
+        duration = perf_counter() - start
+        if token is not None:
+            current_field.reset(token)
+        tracer.record(category, name, start, duration, field or current_field.get(), **event)
+
+
+def traced(category, name, field=None):
+    """
+    Context manager timing the enclosed block as an event, if there is a tracer
+
+    The yielded dict can receive extra information, e.g., 'nbytes'.
+    """
+    if (tracer := GLOBAL["tracer"]) is None:
+        return nullcontext({})
+    return span(tracer, category, name, field)
+
+
+def instrumented(lazies):
+    """
+    Time the function calls of the given lazy values (siblings share a single call), while there is a tracer
+
+    The tracer is looked up when the function is called, not when the lazy value is created.
+
+    >>> from idict import idict, setup
+    >>> d = idict(x=3) >> (lambda x: {"y": x + 2}) >> (lambda y: {"z": y * 2})
+    >>> setup(tracer=(tracer := Tracer()))
+    >>> d.y
+    5
+    >>> setup(tracer=False)
+    >>> d.z
+    10
+    >>> [(e["name"], e["args"]["field"]) for e in tracer.events if e["cat"] == "evaluation"]
+    [('<lambda>', 'y')]
+    """
+    for lazy in lazies:
+        lazy.f = Timed(lazy.f, lazy.field)
+
+
+class Timed:
+    """Function whose calls are traced as evaluation of the given field, if there is a tracer at call time"""
+
+    __slots__ = ("f", "field", "name")
+
+    def __init__(self, f, field):
+        self.f, self.field = f, field
+        self.name = getattr(f, "__name__", type(f).__name__)
+
+    def __call__(self, **kwargs):
+        with traced("evaluation", self.name, self.field):
+            return self.f(**kwargs)
@@ -20,67 +20,57 @@
 #  part of this work is illegal and unethical regarding the effort and
 #  time spent here.
 import pickle
+import sys
+import weakref
+from threading import RLock
 
 import lz4.frame as lz4
 
 from idict.config import GLOBAL
+from idict.core.tracing import traced
+
+lock = RLock()
 
 
 def pack(obj, ensure_determinism=True):
-    # r"""
-    # >>> from idict import setup
-    # >>> setup(compression_cachelimit_MB=0.000_100)
-    # >>> memo = GLOBAL["compression_cache"] = {}
-    # >>> GLOBAL["compression_cachesize"] = 0
-    # >>> b = b"000011"
-    # >>> pack(b)
-    # b'pckl_\x04"M\x18h@\x15\x00\x00\x00\x00\x00\x00\x006\x13\x00\x00\x00R\x80\x05\x95\n\x00\x01\x00\xa0C\x06000011\x94.\x00\x00\x00\x00'
-    # >>> memo[id(b)]["unpacked"]
-    # b'000011'
-    # >>> len(memo), GLOBAL["compression_cachesize"], GLOBAL["compression_cachelimit"]
-    # (1, 47, 100)
-    # >>> pack(b"asd")
-    # b'pckl_\x04"M\x18h@\x12\x00\x00\x00\x00\x00\x00\x00\xd9\x10\x00\x00\x00R\x80\x05\x95\x07\x00\x01\x00pC\x03asd\x94.\x00\x00\x00\x00'
-    # >>> len(memo), GLOBAL["compression_cachesize"], GLOBAL["compression_cachelimit"]
-    # (2, 91, 100)
-    # >>> len(pack(b"123"))
-    # 44
-    # >>> len(memo), GLOBAL["compression_cachesize"], GLOBAL["compression_cachelimit"]
-    # (2, 88, 100)
-    # """
-    # # memid = id(obj)
-    # # memo = GLOBAL["compression_cache"]
-    # # if memid in memo:
-    # #     if obj is memo[memid]["unpacked"]:
-    # #         return memo[memid]["packed"]
-    # #     else:
-    # #         # rare collision
-    # #         GLOBAL["compression_cachesize"] -= memo[memid]["packed"]
-    # #         del memo[memid]
-    #
-    try:
-        try:
-            dump = pickle.dumps(obj, protocol=5)
-            prefix = b"pckl_"
-        except:
-            if ensure_determinism:  # pragma: no cover
-                raise NondeterminismException("Cannot serialize deterministically.")
-            import dill
+    r"""
+    Serialize and compress, reusing the blob from the memo when the very same object was already packed/hashed
 
-            dump = dill.dumps(obj, protocol=5)
-            prefix = b"dill_"
-
-        blob = prefix + lz4.compress(dump)
-        #     # GLOBAL["compression_cachesize"] += len(blob)
-        #     # memo[memid] = {"unpacked": obj, "packed": blob}
-        #
-        #     # # LRU
-        #     # keys = iter(list(memo.keys()))
-        #     # while len(memo) > 0 and GLOBAL["compression_cachesize"] > GLOBAL["compression_cachelimit"]:
-        #     #     k = next(keys)
-        #     #     v = memo.pop(k)["packed"]
-        #     #     GLOBAL["compression_cachesize"] -= len(v)
-        #
+    >>> import numpy as np
+    >>> from idict import setup
+    >>> setup(compression_cachelimit_MB=0.000_500, value_memo=True)
+    >>> memo = GLOBAL["compression_cache"]
+    >>> memo.clear()
+    >>> GLOBAL["compression_cachesize"] = 0
+    >>> a = np.arange(10)
+    >>> pack(a) is pack(a)
+    True
+    >>> len(memo), GLOBAL["compression_cachesize"] == len(pack(a)), GLOBAL["compression_cachelimit"]
+    (1, True, 500)
+    >>> b = np.arange(11)
+    >>> size = len(pack(a)) + len(pack(b))
+    >>> len(memo), GLOBAL["compression_cachesize"] == size
+    (2, True)
+    >>> c = np.arange(12)
+    >>> _ = pack(c)  # LRU: the oldest entry (a) is discarded to fit the limit.
+    >>> len(memo), memoized(a, "lz4") is None, memoized(c, "lz4") is None
+    (2, True, False)
+    >>> del b, c  # Entries vanish along with their objects.
+    >>> len(memo), GLOBAL["compression_cachesize"]
+    (0, 0)
+    >>> setup(compression_cachelimit_MB=1000, value_memo=False)
+    >>> pack(a) is pack(a)
+    False
+    """
+    if (entry := memoized(obj, "lz4")) is not None:
+        return entry["blob"]
+    if (entry := memoized(obj, "pickle")) is not None:
+        return compress(entry["blob"])
+    try:
+        with traced("pack", "pack") as event:
+            blob = compress(dump(obj, ensure_determinism))
+            event["nbytes"] = len(blob)
+        memoize(obj, "lz4", blob)
         return blob
     except KeyError as e:  # pragma: no cover
         if str(e) == "'__getstate__'":  # pragma: no cover
@@ -89,19 +79,161 @@ def pack(obj, ensure_determinism=True):
             raise e
 
 
+def memoized(obj, mode):
+    """
+    Fetch the memo entry of an object for the given hashing mode: {"blob": ..., "hashes": {version: hash}}
+
+    Only objects supporting weak references (e.g., DataFrames and numpy arrays) are memoized, and only if
+    setup(value_memo=True). They are expected not to be mutated in place after being inserted into an idict.
+    """
+    if not GLOBAL["value_memo"]:
+        return None
+    memo = GLOBAL["compression_cache"]
+    with lock:
+        if (entry := memo.get((id(obj), mode))) is None or entry["ref"]() is not obj:
+            return None
+        memo.move_to_end((id(obj), mode))
+        return entry
+
+
+def memoize(obj, mode, blob):
+    """Keep the blob (and later its hashes) of an object in memory, within the limit 'compression_cachelimit'."""
+    memo = GLOBAL["compression_cache"]
+    if not GLOBAL["value_memo"] or len(blob) > GLOBAL["compression_cachelimit"]:
+        return None
+    key = (id(obj), mode)
+
+    def discard(_):
+        with lock:
+            if key in memo and memo[key]["ref"] is ref:
+                GLOBAL["compression_cachesize"] -= len(memo.pop(key)["blob"])
+
+    try:
+        ref = weakref.ref(obj, discard)
+    except TypeError:
+        return None
+    entry = {"ref": ref, "blob": blob, "hashes": {}}
+    with lock:
+        if key in memo:  # pragma: no cover
+            GLOBAL["compression_cachesize"] -= len(memo.pop(key)["blob"])
+        memo[key] = entry
+        GLOBAL["compression_cachesize"] += len(blob)
+
+        # LRU
+        while GLOBAL["compression_cachesize"] > GLOBAL["compression_cachelimit"]:
+            _, old = memo.popitem(last=False)
+            GLOBAL["compression_cachesize"] -= len(old["blob"])
+    return entry
+
+
+def dump(obj, ensure_determinism=True):
+    r"""
+    Serialize without compressing, keeping the same prefix adopted by pack()
+
+    >>> dump(b"000011")
+    b'pckl_\x80\x05\x95\n\x00\x00\x00\x00\x00\x00\x00C\x06000011\x94.'
+    >>> compress(dump(b"000011")) == pack(b"000011")
+    True
+    """
+    try:
+        return b"pckl_" + pickle.dumps(obj, protocol=5)
+    except:
+        if ensure_determinism:  # pragma: no cover
+            raise NondeterminismException("Cannot serialize deterministically.")
+        import dill
+
+        return b"dill_" + dill.dumps(obj, protocol=5)
+
+
+def dump_stream(obj, write, chunk_size=1_048_576):
+    r"""
+    Serialize like dump(), but handing the bytes to 'write' in chunks of at most 'chunk_size'
+
+    Large buffers (e.g., numpy arrays) are sliced without being copied.
+    Only pickle is supported, since determinism of dill cannot be checked without the whole blob.
+
+    >>> chunks = []
+    >>> dump_stream(b"000011", lambda chunk: chunks.append(bytes(chunk)), chunk_size=4)
+    >>> chunks[:3]
+    [b'pckl_', b'\x80\x05\x95\n', b'\x00\x00\x00\x00']
+    >>> b"".join(chunks) == dump(b"000011")
+    True
+    """
+
+    class Writer:
+        @staticmethod
+        def write(buffer):
+            view = memoryview(buffer).cast("B")
+            for i in range(0, len(view), chunk_size):
+                write(view[i : i + chunk_size])
+            return len(view)
+
+    write(b"pckl_")
+    pickle.Pickler(Writer, protocol=5).dump(obj)
+
+
+def compress(blob):
+    r"""
+    Compress a blob produced by dump(), an already compressed blob is returned untouched
+
+    Uncompressed blobs are recognized by the pickle PROTO opcode right after the prefix.
+
+    >>> blob = compress(dump(b"000011"))
+    >>> blob
+    b'pckl_\x04"M\x18h@\x15\x00\x00\x00\x00\x00\x00\x006\x13\x00\x00\x00R\x80\x05\x95\n\x00\x01\x00\xa0C\x06000011\x94.\x00\x00\x00\x00'
+    >>> compress(blob) is blob
+    True
+    """
+    if blob[5:6] != b"\x80":
+        return blob
+    return blob[:5] + lz4.compress(blob[5:])
+
+
 def unpack(blob):
     r"""
     >>> unpack(b'pckl_\x04"M\x18h@\x15\x00\x00\x00\x00\x00\x00\x006\x13\x00\x00\x00R\x80\x05\x95\n\x00\x01\x00\xa0C\x06000011\x94.\x00\x00\x00\x00')
     b'000011'
+    >>> unpack(dump(b"000011"))
+    b'000011'
     """
-    prefix = blob[:5]
-    blob = blob[5:]
-    if prefix == b"pckl_":
-        return pickle.loads(lz4.decompress(blob))
-    elif prefix == b"dill_":
-        import dill
+    with traced("unpack", "unpack") as event:
+        event["nbytes"] = len(blob)
+        prefix = blob[:5]
+        blob = blob[5:]
+        if blob[:1] != b"\x80":
+            blob = lz4.decompress(blob)
+        if prefix == b"pckl_":
+            return pickle.loads(blob)
+        elif prefix == b"dill_":
+            import dill
 
-        return dill.loads(lz4.decompress(blob))
+            return dill.loads(blob)
+
+
+def estimated_size(obj):
+    """
+    Cheap estimation of the size of a value in bytes, without serializing it
+
+    >>> estimated_size(b"1234")
+    4
+    >>> import numpy as np
+    >>> estimated_size(np.zeros(1000))
+    8000
+    >>> from pandas import DataFrame
+    >>> estimated_size(DataFrame({"a": np.zeros(1000), "b": np.ones(1000)}))
+    16128
+    """
+    if isinstance(obj, (bytes, bytearray, str)):
+        return len(obj)
+    if hasattr(obj, "memory_usage"):  # pandas
+        try:
+            usage = obj.memory_usage(index=True, deep=False)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        except Exception:  # pragma: no cover
+            pass
+    if isinstance(getattr(obj, "nbytes", None), int):  # numpy
+        return obj.nbytes
+    return sys.getsizeof(obj)
 
 
 class NondeterminismException(Exception):
@@ -26,6 +26,7 @@ from operator import xor as cop
 from random import Random
 from typing import Union, Callable
 
+from garoupa import ø40
 from ldict.core.base import AbstractLazyDict
 
 from idict.parameter.ilet import iLet
@@ -72,6 +73,20 @@ class iFunctionSpace:
     def fromfunctions(*functions):
         return iFunctionSpace(*intersperse(functions, operator.rshift))
 
+    def compile(self, identity=ø40):
+        """
+        Prepare this function space to be applied to many idicts
+
+        >>> from idict import idict
+        >>> fs = iFunctionSpace.fromfunctions(lambda x: {"y": x**2}, lambda y: {"z": y + 1})
+        >>> pipeline = fs.compile()
+        >>> [d.id == (d0 >> fs).id for d0 in [idict(x=1), idict(x=2)] for d in [pipeline(d0)]]
+        [True, True]
+        """
+        from idict.core.ipipeline import iPipeline
+
+        return iPipeline(self, identity)
+
     def __rrshift__(self, left: Union[dict, list, Random, Callable, iLet]):
         if isinstance(left, AbstractLazyDict):
             from idict.core.idict_ import Idict
@@ -0,0 +1,104 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+import asyncio
+
+
+class AsyncCache:
+    """
+    Asynchronous access to a cache: 'contains', 'get', 'set', 'delete', 'getmany', 'contains_many' and 'setmany'
+    are coroutines
+
+    A synchronous cache (dict, Disk, SQLA, ...) is wrapped and its methods are called in an executor
+    (the default one, if none is given), so that many requests can overlap their cache I/O in a single event loop.
+    Natively asynchronous caches should subclass AsyncCache overriding these coroutines.
+
+    >>> async def main(cache):
+    ...     await cache.set("a", 1)
+    ...     return await cache.contains("a"), await cache.contains("b"), await cache.get("a")
+    >>> dic = {}
+    >>> asyncio.run(main(AsyncCache(dic))), dic
+    ((True, False, 1), {'a': 1})
+    """
+
+    def __init__(self, cache=None, executor=None):
+        self.cache = cache
+        self.executor = executor
+        if hasattr(cache, "user_hosh"):
+            self.user_hosh = cache.user_hosh
+
+    async def run(self, f, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, f, *args)
+
+    async def contains(self, key):
+        return await self.run(self.cache.__contains__, key)
+
+    async def get(self, key, *default):
+        """Value of the key; given a default, it is returned when the key is missing, instead of raising KeyError"""
+        if default:
+            return await self.run(self.cache.get, key, *default)
+        return await self.run(self.cache.__getitem__, key)
+
+    async def set(self, key, value):
+        return await self.run(self.cache.__setitem__, key, value)
+
+    async def delete(self, key):
+        return await self.run(self.cache.__delitem__, key)
+
+    async def getmany(self, keys):
+        from idict.persistence.cached import getmany
+
+        return await self.run(getmany, self.cache, keys)
+
+    async def contains_many(self, keys):
+        from idict.persistence.cached import contains_many
+
+        return await self.run(contains_many, self.cache, keys)
+
+    async def setmany(self, values, packed=(), overwrite=()):
+        """
+        Store many values at once, in a single transaction when the cache provides 'setmany', see 'Batch'
+
+        Keys in 'overwrite' are replaced if present, without any moment in which they are missing from the cache.
+
+        >>> dic = {"a": 1}
+        >>> asyncio.run(AsyncCache(dic).setmany({"a": 2, "b": 3}, overwrite={"a"})), dic
+        (None, {'a': 2, 'b': 3})
+        """
+        from idict.persistence.cached import Batch
+
+        batch = Batch(self.cache)
+        for k, v in values.items():
+            if k in packed:
+                batch.setblob(k, v)
+            elif k in overwrite:
+                batch.overwrite(k, v)
+            else:
+                batch[k] = v
+        return await self.run(batch.flush)
+
+    def __repr__(self):
+        return f"AsyncCache→{self.cache!r}"
+
+
+def asynccache(cache):
+    """Asynchronous version of the given cache, unless it is already asynchronous"""
+    return cache if isinstance(cache, AsyncCache) else AsyncCache(cache)
@@ -25,6 +25,9 @@ from typing import TypeVar
 
 VT = TypeVar("VT")
 
+MISSING = object()
+"""Default value telling apart a missing key from a stored None, e.g., 'cache.get(key, MISSING)'"""
+
 
 class Cache(ABC):  # pragma: no cover
     def __contains__(self, item):
@@ -39,6 +42,35 @@ class Cache(ABC):  # pragma: no cover
     def __delitem__(self, key):
         raise NotImplementedError
 
+    def get(self, key, default=None):
+        """Value of the key, or 'default' if it is not present; a single round-trip when possible"""
+        return self[key] if key in self else default
+
+    def getmany(self, keys):
+        """Values of the given keys that are present, fetched at once when possible"""
+        return {k: v for k in keys if (v := self.get(k, MISSING)) is not MISSING}
+
+    def contains_many(self, keys):
+        """Set of the given keys that are present, checked at once when possible"""
+        return {k for k in keys if k in self}
+
+    def setmany(self, values, packed=(), overwrite=()):
+        """
+        Store many values at once, in a single transaction when possible
+
+        Values whose keys are in 'packed' are blobs already packed, see 'CompressedCache.setblob()'.
+        Keys in 'overwrite' may be already stored and have their values replaced;
+        the other ones are inserted, as in '__setitem__'.
+        """
+        for k in overwrite:
+            if k in self:
+                del self[k]
+        for k, v in values.items():
+            if k in packed:
+                self.setblob(k, v)
+            else:
+                self[k] = v
+
     def __repr__(self):
         raise NotImplementedError
 
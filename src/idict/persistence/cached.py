@@ -19,36 +19,116 @@
 #  works or verbatim, obfuscated, compiled or rewritten versions of any
 #  part of this work is illegal and unethical regarding the effort and
 #  time spent here.
+import asyncio
 import json
+from threading import RLock
 
 from ldict.core.base import AbstractLazyDict
 from ldict.lazyval import LazyVal
 
+from idict.core.scheduling import evaluation_workers, schedule, local, evaluation_lean, lean_evaluation
+from idict.core.tracing import traced
+from idict.data.compression import compress
+from idict.persistence.cache import MISSING
+from idict.persistence.pointers import ispointer, resolve, forget, remember
+
+
+class Batch:
+    """
+    Writes to be flushed into a cache at once, i.e., in a single transaction when the cache provides 'setmany'
+
+    >>> cache = {}
+    >>> batch = Batch(cache)
+    >>> batch["a"] = 1
+    >>> batch["b"] = 2
+    >>> cache
+    {}
+    >>> batch.flush()
+    >>> batch.overwrite("a", 3)
+    >>> batch.flush()
+    >>> cache
+    {'b': 2, 'a': 3}
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.values, self.packed, self.overwritten = {}, set(), set()
+
+    def __setitem__(self, key, value):
+        self.values[key] = value
+
+    def setblob(self, key, blob):
+        self.values[key] = blob
+        self.packed.add(key)
+
+    def overwrite(self, key, value):
+        """Replace the value of a key that may be already stored, in the same transaction as the other writes"""
+        self.values[key] = value
+        self.overwritten.add(key)
+
+    def clear(self):
+        self.values, self.packed, self.overwritten = {}, set(), set()
+
+    def flush(self):
+        if not self.values:
+            return
+        with traced("cache", "setmany") as event:
+            event["nbytes"] = sum(len(self.values[k]) for k in self.packed)
+            if hasattr(self.cache, "setmany"):
+                self.cache.setmany(self.values, self.packed, self.overwritten)
+            else:
+                for k in self.overwritten:
+                    if k in self.cache:
+                        del self.cache[k]
+                for k, v in self.values.items():
+                    if k in self.packed:
+                        self.cache.setblob(k, v)
+                    else:
+                        self.cache[k] = v
+        self.clear()
+
 
 # TODO: store metafield even if idict-id is already stored
-def storevalue_func(cache):
-    def f(k, id, value):
-        cache[id] = value
+def storevalue_func(batch):
+    def f(k, id, value, blob=None):
+        batch[id] = value
 
     return f
 
 
-def storeblob_func(cache, blobs):
-    def f(k, id, value):
-        if k in blobs:
-            cache.setblob(id, blobs[k])
+def storeblob_func(batch, blobs):
+    def f(k, id, value, blob=None):
+        if blob is not None:  # Already packed, e.g., shipped back from a worker process.
+            batch.setblob(id, blob)
+        elif k in blobs:
+            # Blobs hashed in 'pickle' mode are compressed only now.
+            batch.setblob(id, compress(blobs[k]))
         else:
-            cache[id] = value
+            batch[id] = value
 
     return f
 
 
-def cached(d, cache) -> AbstractLazyDict:
+def cached(d, cache, batch=None) -> AbstractLazyDict:
     """
     Store each value (fid: value) and an extra value containing the fids (did: {"_id": did, "_ids": fids}).
     When the dict is a singleton, we have to use "_"+id[1:] as dict id to workaround the ambiguity did=fid.
 
     Lock the id during the job, to avoid duplicate jobs in a distributed system, if supported by the provided cache.
+
+    All values of a job are written at once along with the descriptor of the idict, see Batch.
+    Values of nested idicts are collected into the 'batch' of the parent job, which flushes it.
+    The exception is lean evaluation, where each field is flushed as soon as it is evaluated.
+
+    >>> from idict import idict
+    >>> class Counting(dict):
+    ...     flushes = 0
+    ...     def setmany(self, values, packed=(), overwrite=()):
+    ...         self.flushes += 1
+    ...         self.update(values)
+    >>> d = idict(x=1, e=idict(y=2, f=idict(z=3))) >> [cache := Counting()]
+    >>> cache.flushes, len(cache)
+    (1, 8)
     """
     # TODO: gravar hashes como aliases no cache pros hoshes. tb recuperar. [serve p/ poupar espaço. e tráfego se usar duplo cache local-remoto]
     #  mas hash não é antecipável! 'cached' teria de fazer o ponteiro: ho -> {"_id": ". . ."}.  aproveitar pack() para guardar todo valor assim.
@@ -56,52 +136,89 @@ def cached(d, cache) -> AbstractLazyDict:
     from idict.core.frozenidentifieddict import FrozenIdentifiedDict
 
     # TODO (minor): do the same for fetch(). useful in the future if needed to speedup syncing of caches avoiding *pack
-    store = storeblob_func(cache, d.blobs) if hasattr(cache, "setblob") else storevalue_func(cache)
+    shared, batch = batch, Batch(cache)  # Lazy fields are stored by their own jobs, i.e., in their own batch.
+    store = storeblob_func(batch, d.blobs) if hasattr(cache, "setblob") else storevalue_func(batch)
     front_id = "_" + d.id[1:]
+    lock = RLock()
 
     def closure(outputf, fid, fids, data, output_fields, id):
+        @local
         def func(**kwargs):
-            # Try loading.
-            if fid in cache:
-                return get_following_pointers(fid, cache)
-
-            # Lock the id for this job.
-            if hasattr(cache, "lock"):
-                if (t := cache.lockid(fid)) is not None:
-                    raise LockedEntryException(f"There is already a job producing the data {fid}, since {t}.")
-
-            # Process and save (all fields, to avoid a parcial idict being stored).
-            k = None
-            changed = False
-            for k, v in fids.items():
-                if isinstance(data[k], LazyVal):
-                    data[k] = data[k](**kwargs)
-                if isinstance(data[k], (FrozenIdentifiedDict, Idict)):
-                    cache[v] = {"_id": "_" + data[k].id[1:]}
-                    data[k] = cached(data[k], cache)
-                    changed = True
-                elif v not in cache:
-                    store(k, v, data[k])
-                    changed = True
-            if (result := data[outputf]) is None:  # pragma: no cover
-                if k is None:
-                    raise Exception(f"No ids")
-                raise Exception(f"Key {k} not in output fields: {output_fields}. ids: {fids.items()}")
-
-            front_id_ = front_id
-            if hasattr(cache, "user_hosh"):
-                # print("has hosh", d.id)
-                if front_id_ in cache and changed:
-                    del cache[front_id_]
-                if front_id_ not in cache:
-                    cache[front_id_] = {"_id": id, "_ids": {k: v for k, v in fids.items() if not k.startswith("_")}}
-                front_id_ = (d.id * cache.user_hosh).id
-            cache[front_id_] = {"_id": id, "_ids": fids}
-
-            # Unlock id.
-            if hasattr(cache, "unlock"):
-                cache.unlockid(fid)
-            return result
+            with lock:  # Fields produced by the same job are stored once, even if requested concurrently.
+                # Try loading.
+                with traced("cache", "get", outputf):
+                    if (value := get_following_pointers(fid, cache, MISSING)) is not MISSING:
+                        return value
+
+                # Lock the id for this job.
+                if hasattr(cache, "lock"):
+                    if (t := cache.lockid(fid)) is not None:
+                        raise LockedEntryException(f"There is already a job producing the data {fid}, since {t}.")
+
+                # Produce independent fields concurrently, if evaluation was requested with many workers.
+                if (workers := evaluation_workers.get()) > 1:
+                    schedule([v for k, v in data.items() if k in fids and isinstance(v, LazyVal)], workers)
+
+                # Process and save (all fields, to avoid a parcial idict being stored).
+                batch.clear()  # Discard writes left by a failed job.
+                present = contains_many(cache, fids.values())
+                k = None
+                changed = False
+                if lean := evaluation_lean.get():
+                    # Store each field as soon as it is evaluated, keeping only the requested one in memory.
+                    pending = {v: k for k, v in data.items() if k in fids and isinstance(v, LazyVal)}
+
+                    def done(lazy):
+                        nonlocal changed
+                        if (k := pending.get(lazy)) is not None and fids[k] not in present:
+                            if isinstance(value := lazy.result, (FrozenIdentifiedDict, Idict)):
+                                batch[fids[k]] = {"_id": "_" + value.id[1:]}
+                                cached(value, cache, batch)
+                                batch.flush()
+                            else:
+                                store(k, fids[k], value, vars(lazy).pop("blob", None))
+                                batch.flush()  # Values are not kept in memory until the end of the job.
+                            changed = True
+
+                    lean_evaluation(list(pending), [data[outputf]], done)
+                    result = data[outputf].result
+                    for lazy in pending:  # The original idict is left lazy.
+                        lazy.result = None
+                for k, v in fids.items():
+                    blob = None
+                    if isinstance(lazy := data[k], LazyVal):
+                        if lean:
+                            continue
+                        data[k] = lazy(**kwargs)
+                        blob = vars(lazy).pop("blob", None)
+                    if isinstance(data[k], (FrozenIdentifiedDict, Idict)):
+                        batch[v] = {"_id": "_" + data[k].id[1:]}
+                        data[k] = cached(data[k], cache, batch)
+                        changed = True
+                    elif v not in present:
+                        store(k, v, data[k], blob)
+                        changed = True
+                if not lean:
+                    result = data[outputf]
+                if result is None:  # pragma: no cover
+                    if k is None:
+                        raise Exception(f"No ids")
+                    raise Exception(f"Key {k} not in output fields: {output_fields}. ids: {fids.items()}")
+
+                front_id_ = front_id
+                if hasattr(cache, "user_hosh"):
+                    # print("has hosh", d.id)
+                    if changed or front_id_ not in cache:
+                        descriptor = {"_id": id, "_ids": {k: v for k, v in fids.items() if not k.startswith("_")}}
+                        batch.overwrite(front_id_, descriptor)
+                    front_id_ = (d.id * cache.user_hosh).id
+                batch.overwrite(front_id_, {"_id": id, "_ids": fids})
+                batch.flush()
+
+                # Unlock id.
+                if hasattr(cache, "unlock"):
+                    cache.unlockid(fid)
+                return result
 
         return func
 
@@ -123,23 +240,29 @@ def cached(d, cache) -> AbstractLazyDict:
 
     # Eager saving when there are no lazies.
     if not lazies:
+        if shared is not None:
+            batch = shared
+            store = storeblob_func(batch, d.blobs) if hasattr(cache, "setblob") else storevalue_func(batch)
         changed = False
+        present = contains_many(cache, d.ids.values())
         for k, fid in d.ids.items():
-            if fid not in cache:
+            if fid not in present:
                 if isinstance(data[k], (FrozenIdentifiedDict, Idict)):
-                    cache[fid] = {"_id": "_" + data[k].id[1:]}
-                    data[k] = cached(data[k], cache)
+                    batch[fid] = {"_id": "_" + data[k].id[1:]}
+                    data[k] = cached(data[k], cache, batch)
                 else:
                     store(k, fid, data[k])
                 changed = True
         front_id_ = (d.id * cache.user_hosh).id if hasattr(cache, "user_hosh") else front_id
-        if front_id_ in cache and changed:
-            del cache[front_id_]
-        if front_id_ not in cache:
+        if changed or front_id_ not in cache:
             if hasattr(cache, "user_hosh"):
-                cache[front_id_] = {"_id": d.id, "_ids": {k: v for k, v in d.ids.items() if not k.startswith("_")}}
+                batch.overwrite(
+                    front_id_, {"_id": d.id, "_ids": {k: v for k, v in d.ids.items() if not k.startswith("_")}}
+                )
             else:
-                cache[front_id_] = {"_id": d.id, "_ids": d.ids}
+                batch.overwrite(front_id_, {"_id": d.id, "_ids": d.ids})
+        if shared is None:
+            batch.flush()
 
     return d.clone(data)
 
@@ -354,22 +477,25 @@ def build(id, ids, cache, identity, include_blobs=False):
     I0_dac96298c4c5bf8cb0cde8d8eb3e4a78ca1af
     """
     from idict.core.frozenidentifieddict import FrozenIdentifiedDict
+    from idict.core.interning import interned, lookup
 
     if include_blobs:
         raise NotImplementedError
+    if (d := lookup(id, ids)) is not None:
+        return d
     hosh = identity * id
     data, hashes, hoshes = {}, {}, {}
+    values = getmany_following_pointers(ids.values(), cache)
     for k, fid in ids.items():
         # REMINDER: An item id will never start with '_'. That only happens with singleton-idict id translated to cache.
-        if fid in cache:
-            value = get_following_pointers(fid, cache)
-            # WARN: The closures bellow assume items will not be removed from 'cache' in the meantime.
+        if fid in values:
+            value = values[fid]
+            # WARN: The closure bellow assumes items will not be removed from 'cache' in the meantime.
             if isinstance(value, dict) and list(value.keys()) == ["_id", "_ids"]:
                 closure = lambda value_: lambda **kwargs: build(value_["_id"], value_["_ids"], cache, identity)
-                data[k] = LazyVal(k, closure(value), {"↑": None}, {}, None)
-            else:
-                closure = lambda fid_: lambda **kwargs: cache[fid_]
-                data[k] = LazyVal(k, closure(fid), {"↑": None}, {}, None)
+            else:  # The value was already fetched.
+                closure = lambda value_: lambda **kwargs: value_
+            data[k] = LazyVal(k, closure(value), {"↑": None}, {}, None)
         else:  # pragma: no cover
             raise Exception(f"Missing key={fid} or singleton key=_{fid[1:]}.\n{json.dumps(cache, indent=2)}")
         hoshes[k] = identity * fid
@@ -377,14 +503,239 @@ def build(id, ids, cache, identity, include_blobs=False):
             hashes[k] = hoshes[k] // k.encode()
 
     internals = dict(blobs={}, hashes=hashes, hoshes=hoshes, hosh=hosh)
-    return FrozenIdentifiedDict(data, identity=identity, _cloned=internals)
+    return interned(FrozenIdentifiedDict(data, identity=identity, _cloned=internals))
+
+
+def get_following_pointers(fid, cache, *default):
+    """
+    Fetch item value from cache following pointers
+
+    Given a 'default', it is returned when the item is missing, instead of raising KeyError.
+    Each hop takes a single round-trip to the cache.
+
+    The final target of a chain is remembered, so it is fetched directly in a single round-trip next time,
+    see getmany_following_pointers().
+
+    >>> cache = {"a": {"_id": "b"}, "b": {"_id": "c"}, "c": 2}
+    >>> get_following_pointers("a", cache), get_following_pointers("d", cache, None)
+    (2, None)
+    >>> del cache["b"]  # Chain a→b→c is known, b is not needed anymore.
+    >>> get_following_pointers("a", cache)
+    2
+    >>> for k in "ab":
+    ...     forget(k)
+    """
+    with traced("cache", "pointers") as event:
+        if (key := resolve(fid)) != fid and (result := cache.get(key, MISSING)) is not MISSING:
+            event["hops"] = 0
+            return result
+        forget(fid)
+        if (result := cache.get(fid, MISSING)) is MISSING:
+            if not default:
+                raise KeyError(fid)
+            return default[0]
+        chain, key = [], fid
+        while ispointer(result):
+            chain.append(key)
+            result = cache[(key := result["_id"])]
+        if chain:
+            batch = Batch(cache)
+            for k in remember(fid, chain, key):
+                batch.overwrite(k, {"_id": key})
+            batch.flush()
+        event["hops"] = len(chain)
+    return result
 
 
-def get_following_pointers(fid, cache):
-    """Fetch item value from cache following pointers"""
-    result = cache[fid]
-    while isinstance(result, dict) and list(result.keys()) == ["_id"]:
-        result = cache[result["_id"]]
+def getmany(cache, keys):
+    """
+    Values of the given keys that are present in the cache, fetched at once if the cache provides 'getmany'
+
+    >>> getmany({"a": 1, "b": 2}, ["a", "c"])
+    {'a': 1}
+    """
+    with traced("cache", "getmany") as event:
+        event["keys"] = len(keys := list(keys))
+        if hasattr(cache, "getmany"):
+            return cache.getmany(keys)
+        return {k: v for k in keys if (v := cache.get(k, MISSING)) is not MISSING}
+
+
+def contains_many(cache, keys):
+    """
+    Set of the given keys that are present in the cache, checked at once if the cache provides 'contains_many'
+
+    >>> sorted(contains_many({"a": 1, "b": 2}, ["a", "b", "c"]))
+    ['a', 'b']
+    """
+    with traced("cache", "contains_many") as event:
+        event["keys"] = len(keys := list(keys))
+        if hasattr(cache, "contains_many"):
+            return cache.contains_many(keys)
+        return {k for k in keys if k in cache}
+
+
+def getmany_following_pointers(keys, cache):
+    """
+    Fetch values from cache following pointers, with a bulk query for the keys and another one per level of pointers
+
+    Final targets of pointers are remembered in memory (see idict.persistence.pointers), so fetching them again
+    takes a single bulk query, e.g., when building the same nested idict many times.
+    Keys are expected to be present in the cache, e.g., fields listed by a stored idict.
+    Known targets that are missing in the cache at hand are followed again from the original keys.
+
+    >>> cache = {"A": 1, "B": {"_id": "C"}, "C": {"_id": "D"}, "D": 4}
+    >>> getmany_following_pointers(["A", "B", "E"], cache)
+    {'A': 1, 'B': 4}
+    >>> del cache["C"]  # Chain B→C→D is known, C is not needed anymore.
+    >>> getmany_following_pointers(["A", "B"], cache)
+    {'A': 1, 'B': 4}
+    """
+    where = {k: resolve(k) for k in keys}
+    found = getmany(cache, set(where.values()))
+    values = {k: found[w] for k, w in where.items() if w in found}
+    if stale := [k for k, w in where.items() if w != k and k not in values]:
+        for k in stale:
+            forget(k)
+            where[k] = k
+        values.update(getmany(cache, stale))
+    chains = {k: [] for k in values}
+    pointers = {k: v["_id"] for k, v in values.items() if ispointer(v)}
+    while pointers:
+        targets = getmany(cache, set(pointers.values()))
+        for k, target in pointers.items():
+            chains[k].append(where[k])
+            where[k], values[k] = target, targets[target]
+        pointers = {k: values[k]["_id"] for k in pointers if ispointer(values[k])}
+    batch = Batch(cache)
+    for k, chain in chains.items():
+        if chain:
+            for key in remember(k, chain, where[k]):
+                batch.overwrite(key, {"_id": where[k]})
+    batch.flush()
+    return values
+
+
+async def abuild(id, ids, cache, identity):
+    """
+    Build an idict from a given identity, fetching all its values at once and inner idicts concurrently
+
+    'cache' should be an AsyncCache.
+
+    >>> import asyncio
+    >>> from idict import idict
+    >>> from idict.persistence.asynccache import AsyncCache
+    >>> b = idict(y=7, d=idict(x=5, z=9)) >> [cache := {}]
+    >>> d = asyncio.run(abuild(b.id, b.ids, AsyncCache(cache), b.hosh.ø))
+    >>> d.show(colored=False)
+    {
+        "y": 7,
+        "d": {
+            "x": 5,
+            "z": 9,
+            "_id": "r._72191dfc2ed7d9ff4c35d514b103ac114161f",
+            "_ids": {
+                "x": "GS_cb0fda15eac732cb08351e71fc359058b93bd",
+                "z": "N8_524991e7434b2d3444007782c4cd0cd887261"
+            }
+        },
+        "_id": "oU_ab54a36ac6988bc6722654831fc721f5777ae",
+        "_ids": {
+            "y": "WK_6ba95267cec724067d58b3186ecbcaa4253ad (content: 3m_131910d18a892d1b64285250092a4967c8065)",
+            "d": "u9_698c410308e557c005cda07ba00c564152401 (content: r._72191dfc2ed7d9ff4c35d514b103ac114161f)"
+        }
+    }
+    >>> d == build(b.id, b.ids, cache, b.hosh.ø)
+    True
+    """
+    from idict.core.frozenidentifieddict import FrozenIdentifiedDict
+    from idict.core.interning import interned, lookup
+
+    if (d := lookup(id, ids)) is not None:
+        return d
+
+    async def fetch(value):
+        if isinstance(value, dict) and list(value.keys()) == ["_id", "_ids"]:
+            return await abuild(value["_id"], value["_ids"], cache, identity)
+        return value
+
+    values = await agetmany_following_pointers(ids.values(), cache)
+    for fid in ids.values():
+        # REMINDER: An item id will never start with '_'. That only happens with singleton-idict id translated to cache.
+        if fid not in values:  # pragma: no cover
+            raise Exception(f"Missing key={fid} or singleton key=_{fid[1:]}.")
+    values = await asyncio.gather(*(fetch(values[fid]) for fid in ids.values()))
+    hosh = identity * id
+    data, hashes, hoshes = dict(zip(ids, values)), {}, {}
+    for k, fid in ids.items():
+        hoshes[k] = identity * fid
+        if fid[2] == "_":
+            hashes[k] = hoshes[k] // k.encode()
+
+    internals = dict(blobs={}, hashes=hashes, hoshes=hoshes, hosh=hosh)
+    return interned(FrozenIdentifiedDict(data, identity=identity, _cloned=internals))
+
+
+async def agetmany_following_pointers(keys, cache):
+    """Asynchronous version of getmany_following_pointers() for an AsyncCache"""
+    where = {k: resolve(k) for k in keys}
+    found = await cache.getmany(set(where.values()))
+    values = {k: found[w] for k, w in where.items() if w in found}
+    if stale := [k for k, w in where.items() if w != k and k not in values]:
+        for k in stale:
+            forget(k)
+            where[k] = k
+        values.update(await cache.getmany(stale))
+    chains = {k: [] for k in values}
+    pointers = {k: v["_id"] for k, v in values.items() if ispointer(v)}
+    while pointers:
+        targets = await cache.getmany(set(pointers.values()))
+        for k, target in pointers.items():
+            chains[k].append(where[k])
+            where[k], values[k] = target, targets[target]
+        pointers = {k: values[k]["_id"] for k in pointers if ispointer(values[k])}
+    rewrites = {}
+    for k, chain in chains.items():
+        if chain:
+            for key in remember(k, chain, where[k]):
+                rewrites[key] = {"_id": where[k]}
+    if rewrites:
+        await cache.setmany(rewrites, overwrite=rewrites.keys())
+    return values
+
+
+async def aget_following_pointers(fid, cache, *default):
+    """
+    Fetch item value from an AsyncCache following pointers, see get_following_pointers()
+
+    Known final targets are fetched directly, see getmany_following_pointers().
+
+    >>> import asyncio
+    >>> from idict.persistence.asynccache import AsyncCache
+    >>> cache = {"F": {"_id": "G"}, "G": {"_id": "H"}, "H": 8}
+    >>> asyncio.run(aget_following_pointers("F", AsyncCache(cache))), resolve("F")
+    (8, 'H')
+    >>> del cache["G"]  # Chain F→G→H is known, G is not needed anymore.
+    >>> asyncio.run(aget_following_pointers("F", AsyncCache(cache)))
+    8
+    >>> print(asyncio.run(aget_following_pointers("I", AsyncCache(cache), None)))
+    None
+    >>> for k in "FG":
+    ...     forget(k)
+    """
+    if (key := resolve(fid)) != fid and (result := await cache.get(key, MISSING)) is not MISSING:
+        return result
+    forget(fid)
+    if (result := await cache.get(fid, MISSING)) is MISSING:
+        if not default:
+            raise KeyError(fid)
+        return default[0]
+    chain, key = [], fid
+    while ispointer(result):
+        chain.append(key)
+        result = await cache.get((key := result["_id"]))
+    if chain and (rewrites := remember(fid, chain, key)):
+        await cache.setmany({k: {"_id": key} for k in rewrites}, overwrite=rewrites)
     return result
 
 
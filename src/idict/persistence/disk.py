@@ -74,6 +74,24 @@ class Disk(Cache):  # pragma:  cover
         with self.decorator() as db:
             db[key] = value
 
+    def get(self, key, default=None):
+        with self.decorator() as db:
+            return db.get(key, default)
+
+    def getmany(self, keys):
+        with self.decorator() as db:
+            return {k: db[k] for k in keys if k in db}
+
+    def contains_many(self, keys):
+        with self.decorator() as db:
+            return {k for k in keys if k in db}
+
+    def setmany(self, values, packed=(), overwrite=()):
+        if packed:  # pragma: no cover
+            raise Exception("Disk does not store blobs.")
+        with self.decorator() as db:
+            db.update(values)
+
     def __getitem__(self, key):
         with self.decorator() as db:
             return db[key]
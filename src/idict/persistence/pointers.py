@@ -0,0 +1,98 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from collections import OrderedDict
+from threading import Lock
+
+from idict.config import GLOBAL
+
+memo = OrderedDict()
+"""
+Final key of each chain of pointers already followed in this process, i.e., pointer key: target key (LRU)
+
+Keys are ids, i.e., derived from content, so a known target holds the same value in any cache where it is present.
+"""
+
+lock = Lock()
+
+
+def ispointer(value):
+    """Values like {"_id": ...} point to the key of another value, e.g., the front id of a nested idict"""
+    return isinstance(value, dict) and list(value.keys()) == ["_id"]
+
+
+def resolve(key):
+    """Key of the final value pointed (directly or through a chain) by the given key, if known, otherwise the key"""
+    if not GLOBAL["pointers_cachelimit"]:
+        return key
+    with lock:
+        if (target := memo.get(key)) is None:
+            return key
+        memo.move_to_end(key)
+        return target
+
+
+def forget(key):
+    """Discard a known target that is not present in the cache at hand"""
+    with lock:
+        memo.pop(key, None)
+
+
+def remember(key, chain, target):
+    """
+    Keep the final target of a chain of pointers starting at 'key' (see setup(pointers_cachelimit=...))
+
+    'chain' contains the keys where pointers were found, starting at 'key' (or at its previously known target).
+    Return the keys that should be rewritten to point directly to the target, if setup(pointer_compression=True).
+
+    >>> from idict import setup
+    >>> remember("p", ["p", "q", "r"], "s"), resolve("p"), resolve("q"), resolve("s")
+    ([], 's', 's', 's')
+    >>> setup(pointer_compression=True)
+    >>> remember("p", ["p", "q", "r"], "s")
+    ['p', 'q']
+    >>> setup(pointer_compression=False)
+    >>> for k in "pqr":
+    ...     forget(k)
+    """
+    with lock:
+        for k in {key, *chain}:
+            memo[k] = target
+            memo.move_to_end(k)
+    trim()
+    return chain[:-1] if GLOBAL["pointer_compression"] else []
+
+
+def trim():
+    """
+    Discard the least recently used targets beyond the limit, e.g., after it is changed through setup()
+
+    >>> from idict import setup
+    >>> remember("p", ["p"], "q")
+    []
+    >>> setup(pointers_cachelimit=0)
+    >>> len(memo), resolve("p")
+    (0, 'p')
+    >>> setup(pointers_cachelimit=100_000)
+    """
+    with lock:
+        while len(memo) > GLOBAL["pointers_cachelimit"]:
+            memo.popitem(last=False)
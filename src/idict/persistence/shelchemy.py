@@ -28,6 +28,7 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
 
 from idict.data.compression import pack, unpack
+from idict.persistence.cache import MISSING
 
 VT = TypeVar("VT")
 Base = declarative_base()
@@ -151,15 +152,29 @@ class ShSQLA:
             session.commit()
 
     def update(self, dic, packing=True):
+        self.setmany(dic, () if packing else dic.keys())
+
+    def setmany(self, values, packed=(), overwrite=()):
+        """
+        Store many values in a single commit; values whose keys are in 'packed' are already packed blobs
+
+        Keys in 'overwrite' are replaced if present, regardless of 'ondup'.
+
+        >>> with sopen() as db:
+        ...     db.setmany({"x": 5, "y": pack(b"raw")}, packed={"y"})
+        ...     db["x"], db["y"]
+        (5, b'raw')
+        """
         with self.sessionctx() as session:
-            for k, v in dic.items():
+            for k, v in values.items():
+                packing, replace = k not in packed, k in overwrite
                 k = check(k)
                 if self.autopack and packing:
                     v = pack(v, ensure_determinism=self.deterministic_packing)
                 elif isinstance(v, str):
                     v = v.encode()
 
-                if self.ondup == "overwrite":
+                if self.ondup == "overwrite" or replace:
                     session.query(Content).filter_by(id=k).delete()
                 if self.ondup == "stop" or session.query(Content).filter_by(id=k).first() is None:
                     content = Content(id=k, blob=v)
@@ -167,6 +182,33 @@ class ShSQLA:
 
             session.commit()
 
+    def getmany(self, keys, packing=True):
+        """
+        Values of the given keys that are present, fetched with a single query (per 500 keys)
+
+        >>> with sopen() as db:
+        ...     db.setmany({"x": 5, "y": 7})
+        ...     db.getmany(["x", "y", "z"]), db.contains_many(["x", "z"])
+        ({'x': 5, 'y': 7}, {'x'})
+        """
+        keys = {check(k): k for k in keys}
+        internal = list(keys)
+        ret = {}
+        with self.sessionctx() as session:
+            for i in range(0, len(internal), 500):
+                for content in session.query(Content).filter(Content.id.in_(internal[i : i + 500])):
+                    ret[keys[content.id]] = unpack(content.blob) if self.autopack and packing else content.blob
+        return {k: ret[k] for k in keys.values() if k in ret}
+
+    def contains_many(self, keys):
+        keys = {check(k): k for k in keys}
+        internal = list(keys)
+        ret = set()
+        with self.sessionctx() as session:
+            for i in range(0, len(internal), 500):
+                ret.update(keys[id] for id, in session.query(Content.id).filter(Content.id.in_(internal[i : i + 500])))
+        return ret
+
     def __getitem__(self, key, packing=True):
         key = check(key)
         with self.sessionctx() as session:
@@ -183,10 +225,26 @@ class ShSQLA:
             session.query(Content).filter_by(id=key).delete()
             session.commit()
 
+    def get(self, key, default=None, packing=True):
+        """
+        Value of the key, or 'default' if it is not present, with a single query
+
+        >>> from idict.persistence.cache import MISSING
+        >>> with sopen() as db:
+        ...     db["x"] = None
+        ...     db.get("x", MISSING), db.get("y", MISSING) is MISSING, db.get("y")
+        (None, True, None)
+        """
+        key = check(key)
+        with self.sessionctx() as session:
+            if (content := session.query(Content).get(key)) is None:
+                return default
+            return unpack(content.blob) if self.autopack and packing else content.blob
+
     def __getattr__(self, key):
         key_ = check(key)
-        if key_ in self:
-            return self[key_]
+        if (value := self.get(key_, MISSING)) is not MISSING:
+            return value
         return self.__getattribute__(key)
 
     def __len__(self):
@@ -29,6 +29,7 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
 
 from idict.data.compression import pack, unpack
+from idict.persistence.cache import MISSING
 from idict.persistence.compressedcache import CompressedCache
 
 VT = TypeVar("VT")
@@ -174,6 +175,60 @@ class SQLA(CompressedCache):
             session.add(content)
             session.commit()
 
+    def getmany(self, keys, packing=True):
+        """
+        Values of the given keys that are present, fetched with a single query (per 500 keys)
+
+        >>> with sqla() as db:
+        ...     db.setmany({"x": 5, "y": 7})
+        ...     db.getmany(["x", "y", "z"]), db.contains_many(["x", "z"])
+        ({'x': 5, 'y': 7}, {'x'})
+        """
+        keys = list(keys)
+        for k in keys:
+            check(k)
+        ret = {}
+        with self.sessionctx() as session:
+            for i in range(0, len(keys), 500):
+                for content in session.query(Content).filter(Content.id.in_(keys[i : i + 500])):
+                    ret[content.id] = unpack(content.blob) if self.autopack and packing else content.blob
+        return {k: ret[k] for k in keys if k in ret}
+
+    def contains_many(self, keys):
+        keys = list(keys)
+        for k in keys:
+            check(k)
+        ret = set()
+        with self.sessionctx() as session:
+            for i in range(0, len(keys), 500):
+                ret.update(id for id, in session.query(Content.id).filter(Content.id.in_(keys[i : i + 500])))
+        return ret
+
+    def setmany(self, values, packed=(), overwrite=()):
+        """
+        Store many values in a single commit; values whose keys are in 'packed' are already packed blobs
+
+        Values are inserted, as in '__setitem__', except for keys in 'overwrite', which are replaced if present.
+
+        >>> with sqla() as db:
+        ...     db.setmany({"x": 5, "y": 7, "z": pack(b"raw")}, packed={"z"})
+        ...     db.setmany({"x": 6}, overwrite={"x"})
+        ...     db
+        {'y': 7, 'z': b'raw', 'x': 6}
+        """
+        contents = []
+        for k, v in values.items():
+            check(k)
+            if self.autopack and k not in packed:
+                v = pack(v, ensure_determinism=self.deterministic_packing)
+            contents.append(Content(id=k, blob=v))
+        overwrite = list(overwrite)
+        with self.sessionctx() as session:
+            for i in range(0, len(overwrite), 500):
+                session.query(Content).filter(Content.id.in_(overwrite[i : i + 500])).delete(synchronize_session=False)
+            session.add_all(contents)
+            session.commit()
+
     def __getitem__(self, key, packing=True):
         check(key)
         with self.sessionctx() as session:
@@ -190,10 +245,26 @@ class SQLA(CompressedCache):
             session.query(Content).filter_by(id=key).delete()
             session.commit()
 
+    def get(self, key, default=None, packing=True):
+        """
+        Value of the key, or 'default' if it is not present, with a single query
+
+        >>> from idict.persistence.cache import MISSING
+        >>> with sqla() as db:
+        ...     db["x"] = None
+        ...     db.get("x", MISSING), db.get("y", MISSING) is MISSING, db.get("y")
+        (None, True, None)
+        """
+        check(key)
+        with self.sessionctx() as session:
+            if (content := session.query(Content).get(key)) is None:
+                return default
+            return unpack(content.blob) if self.autopack and packing else content.blob
+
     def __getattr__(self, key):
         check(key)
-        if key in self:
-            return self[key]
+        if (value := self.get(key, MISSING)) is not MISSING:
+            return value
         return self.__getattribute__(key)
 
     def __len__(self):
@@ -0,0 +1,228 @@
+#  Copyright (c) 2021. Davi Pereira dos Santos
+#  This file is part of the idict project.
+#  Please respect the license - more about this in the section (*) below.
+#
+#  idict is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  idict is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with idict.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  (*) Removing authorship by any means, e.g. by distribution of derived
+#  works or verbatim, obfuscated, compiled or rewritten versions of any
+#  part of this work is illegal and unethical regarding the effort and
+#  time spent here.
+from collections import OrderedDict
+from threading import RLock
+
+from idict.data.compression import estimated_size
+from idict.persistence.cache import Cache, MISSING
+
+
+class Tiered(Cache):
+    """
+    Bounded in-memory LRU in front of a (persistent) cache, usable wherever a cache is accepted
+
+    Values fetched from the backend are promoted to memory, so they are read from there next time.
+    Written values are kept in memory as well and, by default, also written to the backend at once (write-through).
+    Given 'writeback=True', they are written only when evicted from memory or at 'flush()'
+    (called at the end of a 'with' block), which groups the writes of many idicts into a single 'setmany()'.
+    Memory is bounded by the number of 'entries' and by the (estimated) size of values in MBs.
+    'stats' counts hits, misses, promotions, evictions and writes to the backend.
+
+    >>> from idict import idict
+    >>> backend = {}
+    >>> cache = Tiered(backend, entries=2)
+    >>> d = idict(x=3) >> (lambda x: {"y": x + 1}) >> [cache]
+    >>> d.y, len(backend)
+    (4, 3)
+    >>> idict.fromid(d.id, cache).y
+    4
+    >>> cache.stats
+    {'hits': 2, 'misses': 2, 'promotions': 1, 'evictions': 2, 'writes': 3}
+    >>> with Tiered(backend := {}, writeback=True) as cache:
+    ...     d = idict(x=3) >> (lambda x: {"y": x + 1}) >> [cache]
+    ...     d.y, len(backend)
+    (4, 0)
+    >>> len(backend), cache.stats["writes"]
+    (3, 3)
+    """
+
+    def __init__(self, backend, entries=10_000, size_MB=100, writeback=False):
+        self.backend = backend
+        self.entries = entries
+        self.size = int(size_MB * 1_000_000)
+        self.writeback = writeback
+        self.memory = OrderedDict()  # key: (value, estimated size)
+        self.nbytes = 0
+        self.dirty, self.overwritten = set(), set()  # Pending writes (write-back mode), and those replacing values.
+        self.stats = dict(hits=0, misses=0, promotions=0, evictions=0, writes=0)
+        self.mutex = RLock()
+        if hasattr(backend, "user_hosh"):
+            self.user_hosh = backend.user_hosh
+
+    def keep(self, key, value):
+        """Put the value in memory as the most recently used one, evicting the least recently used ones if needed"""
+        if key in self.memory:
+            self.nbytes -= self.memory.pop(key)[1]
+        self.memory[key] = value, (size := estimated_size(value))
+        self.nbytes += size
+        while self.memory and (len(self.memory) > self.entries or self.nbytes > self.size):
+            k, (v, size) = self.memory.popitem(last=False)
+            self.nbytes -= size
+            self.stats["evictions"] += 1
+            if k in self.dirty:
+                self.dirty.remove(k)
+                self.write({k: v}, overwrite={k} & self.overwritten)
+                self.overwritten.discard(k)
+
+    def drop(self, key):
+        """Discard the key from memory, along with its pending write"""
+        if key in self.memory:
+            self.nbytes -= self.memory.pop(key)[1]
+        self.dirty.discard(key)
+        self.overwritten.discard(key)
+
+    def __contains__(self, key):
+        with self.mutex:
+            if key in self.memory:
+                return True
+        return key in self.backend
+
+    def get(self, key, default=None):
+        with self.mutex:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return self.memory[key][0]
+        if (value := self.backend.get(key, MISSING)) is MISSING:
+            with self.mutex:
+                self.stats["misses"] += 1
+            return default
+        with self.mutex:
+            self.stats["misses"] += 1
+            self.stats["promotions"] += 1
+            if key not in self.memory:  # A newer value could have been written in the meantime.
+                self.keep(key, value)
+        return value
+
+    def __getitem__(self, key):
+        if (value := self.get(key, MISSING)) is MISSING:
+            raise KeyError(key)
+        return value
+
+    def getmany(self, keys):
+        values, missing = {}, []
+        with self.mutex:
+            for k in keys:
+                if k in self.memory:
+                    self.memory.move_to_end(k)
+                    values[k] = self.memory[k][0]
+                else:
+                    missing.append(k)
+            self.stats["hits"] += len(values)
+        if missing:
+            if hasattr(self.backend, "getmany"):
+                fetched = self.backend.getmany(missing)
+            else:
+                fetched = {k: v for k in missing if (v := self.backend.get(k, MISSING)) is not MISSING}
+            with self.mutex:
+                self.stats["misses"] += len(missing)
+                self.stats["promotions"] += len(fetched)
+                for k, v in fetched.items():
+                    if k not in self.memory:
+                        self.keep(k, v)
+            values.update(fetched)
+        return values
+
+    def contains_many(self, keys):
+        with self.mutex:
+            present = {k for k in keys if k in self.memory}
+        missing = [k for k in keys if k not in present]
+        if hasattr(self.backend, "contains_many"):
+            return present | self.backend.contains_many(missing)
+        return present | {k for k in missing if k in self.backend}
+
+    def __setitem__(self, key, value):
+        self.setmany({key: value})
+
+    def setmany(self, values, packed=(), overwrite=()):
+        """Packed blobs (see 'CompressedCache.setblob()') go straight to the backend, since memory keeps values"""
+        overwrite = set(overwrite)
+        if packed:  # pragma: no cover
+            with self.mutex:
+                for k in packed:
+                    self.drop(k)
+            self.write({k: v for k, v in values.items() if k in packed}, packed, overwrite & set(packed))
+            values = {k: v for k, v in values.items() if k not in packed}
+        with self.mutex:
+            for k, v in values.items():
+                self.keep(k, v)
+            if self.writeback:
+                pending = {k for k in values if k in self.memory}
+                self.dirty.update(pending)
+                self.overwritten.update(pending & overwrite)
+                values = {k: v for k, v in values.items() if k not in pending}  # Evicted right away.
+        self.write(values, overwrite=overwrite & values.keys())
+
+    def write(self, values, packed=(), overwrite=()):
+        if not values:
+            return
+        if hasattr(self.backend, "setmany"):
+            self.backend.setmany(values, packed, overwrite)
+        else:
+            for k in overwrite:
+                if k in self.backend:
+                    del self.backend[k]
+            for k, v in values.items():
+                if k in packed:  # pragma: no cover
+                    self.backend.setblob(k, v)
+                else:
+                    self.backend[k] = v
+        with self.mutex:
+            self.stats["writes"] += len(values)
+
+    def flush(self):
+        """Write pending values to the backend at once (write-back mode)"""
+        with self.mutex:
+            values = {k: self.memory[k][0] for k in self.memory if k in self.dirty}
+            overwrite, self.dirty, self.overwritten = self.overwritten, set(), set()
+        self.write(values, overwrite=overwrite)
+
+    def __delitem__(self, key):
+        with self.mutex:
+            dirty = key in self.dirty
+            self.drop(key)
+        if not dirty or key in self.backend:  # A pending value may have never been written.
+            del self.backend[key]
+
+    def __iter__(self):
+        with self.mutex:
+            dirty = [k for k in self.memory if k in self.dirty]
+        yield from dirty
+        for k in self.backend.keys():
+            if k not in dirty:
+                yield k
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+
+    def __repr__(self):
+        return f"Tiered({len(self.memory)}/{self.entries} entries, {self.nbytes}/{self.size} bytes)→{self.backend!r}"
+
+    def copy(self):
+        self.flush()
+        return self.backend.copy()
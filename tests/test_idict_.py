@@ -19,6 +19,7 @@
 #  works or verbatim, obfuscated, compiled or rewritten versions of any
 #  part of this work is illegal and unethical regarding the effort and
 #  time spent here.
+import os
 from unittest import TestCase
 
 import pytest
@@ -241,3 +242,143 @@ class TestLdict(TestCase):
 
     def test_compression(self):
         self.assertTrue(callable(unpack(pack(lambda a: 5, ensure_determinism=False))))
+
+    def test_hashing_pickle(self):
+        from idict import setup
+        from idict.persistence.sqla import sqla
+
+        setup(hashing="pickle")
+        try:
+            d = idict(x=[1, 2, 3] * 100)
+            self.assertEqual(d.blobs["x"][5:6], b"\x80")  # Not compressed at hashing.
+            with sqla() as cache:
+                d >>= [cache]
+                blob = cache.getblob(d.ids["x"])
+                self.assertNotEqual(blob[5:6], b"\x80")  # Compressed when stored.
+                self.assertEqual(idict(d.id, cache).x, [1, 2, 3] * 100)
+        finally:
+            setup(hashing="lz4")
+
+    def test_parallel_hashing(self):
+        import numpy as np
+        from idict import setup
+
+        fields = {f"a{i}": np.arange(i, 100_000 + i) for i in range(8)}
+        fields["f"] = lambda a0: {"z": a0}
+        setup(hashing_threads=1)
+        serial = idict(**fields)
+        setup(parallel_hashing_threshold_MB=0, hashing_threads=4)
+        try:
+            parallel = idict(**fields)
+        finally:
+            setup(parallel_hashing_threshold_MB=10, hashing_threads=min(8, os.cpu_count() or 1))
+        self.assertEqual(serial.ids, parallel.ids)
+        self.assertEqual(list(serial.blobs.keys()), list(parallel.blobs.keys()))
+
+    def test_streaming_hashing(self):
+        import numpy as np
+        from idict import setup
+        from idict.persistence.sqla import sqla
+
+        a = np.random.default_rng(0).random(200_000)
+        setup(hashing="pickle")
+        try:
+            whole = idict(a=a.copy())
+            setup(streaming_threshold_MB=0)
+            streamed = idict(a=a.copy())
+            setup(streaming_compression=False)
+            streamed_noblob = idict(a=a.copy())
+            self.assertNotIn("a", streamed_noblob.blobs)
+            with sqla() as cache:
+                d = streamed >> [cache]
+                self.assertTrue((idict(d.id, cache).a == a).all())
+        finally:
+            setup(hashing="lz4", streaming_threshold_MB=100, streaming_compression=True)
+        self.assertEqual(whole.ids, streamed.ids)
+        self.assertEqual(whole.ids, streamed_noblob.ids)
+
+    def test_tiered_cache(self):
+        from idict import setup
+        from idict.config import GLOBAL
+        from idict.persistence.disk import Disk
+        from idict.persistence.tiered import Tiered
+        from tempfile import TemporaryDirectory
+
+        tmp = TemporaryDirectory()
+        path = f"{tmp.name}/tiered.db"
+        previous = GLOBAL["cache"]
+        setup(cache=(cache := Tiered(Disk(path), entries=2, writeback=True)))
+        try:
+            d = idict(x=3, w=5) >> (lambda x, w: {"y": x + w, "z": x * w}) ^ {}  # Cached into the global cache.
+            self.assertEqual(d.y, 8)
+            self.assertGreater(cache.stats["evictions"], 0)  # Pending values were written when evicted.
+            cache.flush()
+            e = idict(d.id, Disk(path))
+            self.assertEqual((e.y, e.z), (8, 15))
+            del cache[e.ids["z"]]
+            self.assertNotIn(e.ids["z"], Disk(path))
+        finally:
+            setup(cache=previous)
+            tmp.cleanup()
+
+    def test_mutated_value(self):
+        import numpy as np
+
+        a = np.zeros(5)
+        d = idict(a=a)
+        a[0] = 1
+        self.assertNotEqual(idict(a=a).id, d.id)
+
+    def test_typed_dataframe_id(self):
+        from pandas import DataFrame
+        from idict import setup
+
+        class Frame(DataFrame):
+            pass
+
+        setup(hashing="typed")
+        try:
+            d = idict(df=DataFrame({"a": [1, 2], "b": [0.5, 1.5]}))
+            e = idict(df=Frame({"a": [1, 2], "b": [0.5, 1.5]}))
+        finally:
+            setup(hashing="lz4")
+        self.assertEqual(d.blobs, {})  # Hashed by the registered hasher, not pickled.
+        self.assertEqual(d.id, "iZ_29ac3818756ddc7c53eee4fecb794b003e319")
+        self.assertEqual(e.id, d.id)
+
+    def test_column_digest_reuse(self):
+        import numpy as np
+        from unittest.mock import patch
+        from blake3 import blake3
+        from pandas import DataFrame
+        from idict import setup
+
+        df = DataFrame({"a": np.arange(10.0), "b": np.arange(10.0), "c": np.arange(10.0)})
+        setup(hashing="typed", value_memo=True)
+        try:
+            with patch("idict.core.identification.blake3", wraps=blake3) as hasher:
+                idict(df=df).evaluate()
+                whole, hasher.call_count = hasher.call_count, 0
+                idict(df=df.iloc[:, :2]).evaluate()
+                selection = hasher.call_count
+        finally:
+            setup(hashing="lz4", value_memo=False)
+        self.assertEqual(whole, 1 + 2 * 4)  # The hasher, plus 2 for the digest of each column and of the index.
+        self.assertEqual(selection, 1)  # Column digests of the parent frame are reused.
+
+    def test_process_blobs_stored(self):
+        from unittest.mock import patch
+        from pandas import DataFrame
+        from idict.data.compression import pack
+        from idict.function.data import binarize
+        from idict.persistence.sqla import SQLA
+        from tempfile import TemporaryDirectory
+
+        with TemporaryDirectory() as tmp:
+            cache = SQLA(f"sqlite+pysqlite:///{tmp}/process.db")
+            d = idict(X=DataFrame({"a": [0, 1], "b": ["x", "y"]}), nomcols=[1]) >> binarize >> [cache]
+            with patch("idict.persistence.sqla.pack", wraps=pack) as packing:
+                d.evaluate(workers=2, backend="process")
+            # Output blobs shipped back by the workers are stored as they are, only descriptors are packed.
+            self.assertFalse(any(isinstance(c.args[0], DataFrame) for c in packing.call_args_list))
+            self.assertTrue(idict(d.id, cache).Xbin.equals(d.Xbin))